@@ -8,6 +8,7 @@ import { createOpenAI } from '@ai-sdk/openai';
 import { z } from 'zod';
 import { STORAGE_KEYS } from '@/shared/types';
 import { EXTENSION_NAME } from '@/shared/constants';
+import { extractJsonObject } from './providers/types';
 
 /**
  * Zod schema for selector discovery response
@@ -315,12 +316,7 @@ Remember:
     let verdictResult: VerificationVerdictResult;
     try {
       // Extract JSON from the text response (model should return JSON)
-      const jsonMatch = result.text.match(/\{[\s\S]*\}/);
-      if (!jsonMatch) {
-        throw new Error('No JSON found in response');
-      }
-
-      const parsedJson = JSON.parse(jsonMatch[0]);
+      const parsedJson = extractJsonObject(result.text);
       verdictResult = VerificationVerdictSchema.parse(parsedJson);
 
       // If the model didn't include sources in JSON but result.sources exists, use those
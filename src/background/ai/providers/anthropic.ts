@@ -13,6 +13,7 @@ import {
   ClaimDetectionSchema,
   VerificationVerdictResult,
   VerificationVerdictSchema,
+  extractJsonObject,
 } from './types';
 
 export class AnthropicProvider implements AIProvider {
@@ -209,12 +210,7 @@ Remember:
     let verdictResult: VerificationVerdictResult;
     try {
       // Extract JSON from the text response
-      const jsonMatch = result.text.match(/\{[\s\S]*\}/);
-      if (!jsonMatch) {
-        throw new Error('No JSON found in response');
-      }
-
-      const parsedJson = JSON.parse(jsonMatch[0]);
+      const parsedJson = extractJsonObject(result.text);
       verdictResult = VerificationVerdictSchema.parse(parsedJson);
 
       // If the model didn't include sources in JSON but result.sources exists, use those
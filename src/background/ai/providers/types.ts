@@ -53,6 +53,35 @@ export const VerificationVerdictSchema = z.object({
 
 export type VerificationVerdictResult = z.infer<typeof VerificationVerdictSchema>;
 
+/**
+ * Patterns for pulling a JSON object out of free-form model text,
+ * compiled once at module load
+ */
+const BARE_JSON_START = /^\s*\{/;
+const EMBEDDED_JSON_OBJECT = /\{[\s\S]*\}/;
+
+/**
+ * Parse the JSON object in a model's text response.
+ * Responses are usually bare JSON, which is parsed directly; the regex scan
+ * only runs when prose or markdown fences surround the object.
+ */
+export function extractJsonObject(text: string): unknown {
+  if (BARE_JSON_START.test(text)) {
+    try {
+      return JSON.parse(text);
+    } catch {
+      // Not bare JSON after all (e.g. trailing prose); use the pattern
+    }
+  }
+
+  const jsonMatch = text.match(EMBEDDED_JSON_OBJECT);
+  if (!jsonMatch) {
+    throw new Error('No JSON found in response');
+  }
+
+  return JSON.parse(jsonMatch[0]);
+}
+
 /**
  * Core provider interface that all AI providers must implement
  */
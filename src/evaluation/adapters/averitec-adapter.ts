@@ -150,9 +150,29 @@ function extractSources(claim: AVeriTeCClaim): Source[] {
 }
 
 /**
- * Extract title from URL (simple heuristic)
+ * Titles already derived from URLs. Evidence URLs repeat heavily across
+ * claims, so this skips re-parsing them; bounded so huge splits stay flat.
+ */
+const titleCache = new Map<string, string>();
+const TITLE_CACHE_SIZE = 4096;
+
+/**
+ * Extract title from URL (simple heuristic), memoized per URL
  */
 function extractTitle(url: string): string {
+  let title = titleCache.get(url);
+  if (title === undefined) {
+    if (titleCache.size >= TITLE_CACHE_SIZE) {
+      // Evict the oldest entry (Maps iterate in insertion order)
+      titleCache.delete(titleCache.keys().next().value as string);
+    }
+    title = parseTitle(url);
+    titleCache.set(url, title);
+  }
+  return title;
+}
+
+function parseTitle(url: string): string {
   try {
     const urlObj = new URL(url);
     const hostname = urlObj.hostname.replace('www.', '');
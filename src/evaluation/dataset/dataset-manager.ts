@@ -12,6 +12,8 @@ import {
   Stage2Sample,
   validateStage1Sample,
   validateStage2Sample,
+  trustedStage1Sample,
+  trustedStage2Sample,
   validateDatasetBalance,
   Platform,
   Topic,
@@ -25,14 +27,39 @@ export interface DatasetSplits<T> {
   test: T[];
 }
 
+export interface SplitOptions {
+  train?: number;
+  val?: number;
+  test?: number;
+  stratifyBy?: string;
+  randomSeed?: number;
+}
+
+interface SplitIndices {
+  train: Int32Array;
+  val: Int32Array;
+  test: Int32Array;
+}
+
+interface StratifyCodes {
+  codes: Int32Array;
+  numGroups: number;
+}
+
 export class DatasetManager {
   private dataDir: string;
   private stage1Data: Stage1Sample[] | null = null;
   private stage2Data: Stage2Sample[] | null = null;
   
-  // Cached splits
-  private stage1Splits: Map<string, DatasetSplits<Stage1Sample>> = new Map();
-  private stage2Splits: Map<string, DatasetSplits<Stage2Sample>> = new Map();
+  // Cached split indices into stage1Data/stage2Data (cleared on reload)
+  private stage1Splits: Map<string, SplitIndices> = new Map();
+  private stage2Splits: Map<string, SplitIndices> = new Map();
+  
+  // Lazily built getSubset indices: samples array -> field -> value -> indices
+  private fieldIndices: WeakMap<object, Map<string, Map<unknown, number[]>>> = new WeakMap();
+  
+  // Stratification group codes, reused across splits: samples array -> field -> codes
+  private stratifyCodes: WeakMap<object, Map<string, StratifyCodes>> = new WeakMap();
   
   constructor(dataDir: string = './datasets') {
     this.dataDir = dataDir;
@@ -44,9 +71,18 @@ export class DatasetManager {
   }
   
   /**
-   * Load Stage 1 dataset from JSON file
+   * Load Stage 1 dataset from JSON file (array of samples)
    */
-  loadStage1(filename: string = 'stage1_dataset.json'): Stage1Sample[] {
+  loadStage1(
+    filename: string = 'stage1_dataset.json',
+    options: { streaming?: boolean; trusted?: boolean } = {}
+  ): Stage1Sample[] {
+    const { streaming = true, trusted = false } = options;
+    
+    if (filename.endsWith('.jsonl')) {
+      return this.loadStage1Jsonl(filename, { trusted });
+    }
+    
     const filepath = path.join(this.dataDir, filename);
     
     if (!fs.existsSync(filepath)) {
@@ -54,13 +90,19 @@ export class DatasetManager {
       return [];
     }
     
-    const content = fs.readFileSync(filepath, 'utf-8');
-    const data = JSON.parse(content);
+    // Streaming validates each item as it is parsed instead of first
+    // materializing the whole array; small files can opt out
+    const data: Iterable<any> = streaming
+      ? readJsonArrayItems(filepath)
+      : JSON.parse(fs.readFileSync(filepath, 'utf-8'));
+    
+    // Trusted data (e.g. written by saveStage1) skips schema validation
+    const build = trusted ? trustedStage1Sample : validateStage1Sample;
     
     const samples: Stage1Sample[] = [];
     for (const item of data) {
       try {
-        const sample = validateStage1Sample(item);
+        const sample = build(item);
         samples.push(sample);
       } catch (error) {
         console.error(`Error loading sample ${item.id || 'unknown'}:`, error);
@@ -68,6 +110,7 @@ export class DatasetManager {
     }
     
     this.stage1Data = samples;
+    this.stage1Splits.clear();
     console.log(`Loaded ${samples.length} Stage 1 samples from ${filepath}`);
     
     // Print dataset balance
@@ -78,9 +121,18 @@ export class DatasetManager {
   }
   
   /**
-   * Load Stage 2 dataset from JSON file
+   * Load Stage 2 dataset from JSON file (array of samples)
    */
-  loadStage2(filename: string = 'stage2_dataset.json'): Stage2Sample[] {
+  loadStage2(
+    filename: string = 'stage2_dataset.json',
+    options: { streaming?: boolean; trusted?: boolean } = {}
+  ): Stage2Sample[] {
+    const { streaming = true, trusted = false } = options;
+    
+    if (filename.endsWith('.jsonl')) {
+      return this.loadStage2Jsonl(filename, { trusted });
+    }
+    
     const filepath = path.join(this.dataDir, filename);
     
     if (!fs.existsSync(filepath)) {
@@ -88,13 +140,19 @@ export class DatasetManager {
       return [];
     }
     
-    const content = fs.readFileSync(filepath, 'utf-8');
-    const data = JSON.parse(content);
+    // Streaming validates each item as it is parsed instead of first
+    // materializing the whole array; small files can opt out
+    const data: Iterable<any> = streaming
+      ? readJsonArrayItems(filepath)
+      : JSON.parse(fs.readFileSync(filepath, 'utf-8'));
+    
+    // Trusted data (e.g. written by saveStage2) skips schema validation
+    const build = trusted ? trustedStage2Sample : validateStage2Sample;
     
     const samples: Stage2Sample[] = [];
     for (const item of data) {
       try {
-        const sample = validateStage2Sample(item);
+        const sample = build(item);
         samples.push(sample);
       } catch (error) {
         console.error(`Error loading sample ${item.id || 'unknown'}:`, error);
@@ -102,6 +160,89 @@ export class DatasetManager {
     }
     
     this.stage2Data = samples;
+    this.stage2Splits.clear();
+    console.log(`Loaded ${samples.length} Stage 2 samples from ${filepath}`);
+    
+    // Print dataset balance
+    const balance = validateDatasetBalance(samples, 'verdict');
+    console.log('Dataset balance:', balance);
+    
+    return samples;
+  }
+  
+  /**
+   * Load Stage 1 dataset from JSONL file (one sample per line)
+   */
+  loadStage1Jsonl(
+    filename: string = 'stage1_dataset.jsonl',
+    options: { trusted?: boolean } = {}
+  ): Stage1Sample[] {
+    const { trusted = false } = options;
+    const filepath = path.join(this.dataDir, filename);
+    
+    if (!fs.existsSync(filepath)) {
+      console.warn(`Warning: ${filepath} not found. Creating empty dataset.`);
+      return [];
+    }
+    
+    const build = trusted ? trustedStage1Sample : validateStage1Sample;
+    
+    const samples: Stage1Sample[] = [];
+    for (const line of readLines(filepath)) {
+      if (!line.trim()) continue;
+      
+      let item: any;
+      try {
+        item = JSON.parse(line);
+        samples.push(build(item));
+      } catch (error) {
+        console.error(`Error loading sample ${item?.id || 'unknown'}:`, error);
+      }
+    }
+    
+    this.stage1Data = samples;
+    this.stage1Splits.clear();
+    console.log(`Loaded ${samples.length} Stage 1 samples from ${filepath}`);
+    
+    // Print dataset balance
+    const balance = validateDatasetBalance(samples, 'hasClaim');
+    console.log('Dataset balance:', balance);
+    
+    return samples;
+  }
+  
+  /**
+   * Load Stage 2 dataset from JSONL file (one sample per line)
+   */
+  loadStage2Jsonl(
+    filename: string = 'stage2_dataset.jsonl',
+    options: { trusted?: boolean } = {}
+  ): Stage2Sample[] {
+    const { trusted = false } = options;
+    const filepath = path.join(this.dataDir, filename);
+    
+    if (!fs.existsSync(filepath)) {
+      console.warn(`Warning: ${filepath} not found. Creating empty dataset.`);
+      return [];
+    }
+    
+    const build = trusted ? trustedStage2Sample : validateStage2Sample;
+    
+    const samples: Stage2Sample[] = [];
+    for (const line of readLines(filepath)) {
+      if (!line.trim()) continue;
+      
+      let item: any;
+      try {
+        item = JSON.parse(line);
+        samples.push(build(item));
+      } catch (error) {
+        console.error(`Error loading sample ${item?.id || 'unknown'}:`, error);
+      }
+    }
+    
+    this.stage2Data = samples;
+    this.stage2Splits.clear();
     console.log(`Loaded ${samples.length} Stage 2 samples from ${filepath}`);
     
     // Print dataset balance
@@ -112,36 +253,54 @@ export class DatasetManager {
   }
   
   /**
-   * Save Stage 1 dataset to JSON file
+   * Save Stage 1 dataset to JSON file (JSONL if filename ends in .jsonl).
+   * Output is compact unless `pretty` is set for human-readable files.
    */
-  saveStage1(samples: Stage1Sample[], filename: string = 'stage1_dataset.json'): void {
+  saveStage1(
+    samples: Stage1Sample[],
+    filename: string = 'stage1_dataset.json',
+    options: { pretty?: boolean } = {}
+  ): void {
     const filepath = path.join(this.dataDir, filename);
-    fs.writeFileSync(filepath, JSON.stringify(samples, null, 2), 'utf-8');
+    fs.writeFileSync(filepath, serializeSamples(samples, filepath, options.pretty), 'utf-8');
     console.log(`Saved ${samples.length} Stage 1 samples to ${filepath}`);
   }
   
   /**
-   * Save Stage 2 dataset to JSON file
+   * Save Stage 2 dataset to JSON file (JSONL if filename ends in .jsonl).
+   * Output is compact unless `pretty` is set for human-readable files.
    */
-  saveStage2(samples: Stage2Sample[], filename: string = 'stage2_dataset.json'): void {
+  saveStage2(
+    samples: Stage2Sample[],
+    filename: string = 'stage2_dataset.json',
+    options: { pretty?: boolean } = {}
+  ): void {
     const filepath = path.join(this.dataDir, filename);
-    fs.writeFileSync(filepath, JSON.stringify(samples, null, 2), 'utf-8');
+    fs.writeFileSync(filepath, serializeSamples(samples, filepath, options.pretty), 'utf-8');
     console.log(`Saved ${samples.length} Stage 2 samples to ${filepath}`);
   }
   
   /**
    * Split dataset into train/validation/test sets
    */
-  trainValTestSplit<T>(
+  trainValTestSplit<T>(stage: 1 | 2, options: SplitOptions = {}): DatasetSplits<T> {
+    const { samples, indices } = this.getSplitIndices(stage, options);
+    
+    // Only index arrays are cached; sample lists are rebuilt on demand
+    return {
+      train: gather(samples, indices.train),
+      val: gather(samples, indices.val),
+      test: gather(samples, indices.test),
+    };
+  }
+  
+  /**
+   * Compute (or fetch from cache) the sample indices of each split
+   */
+  private getSplitIndices(
     stage: 1 | 2,
-    options: {
-      train?: number;
-      val?: number;
-      test?: number;
-      stratifyBy?: string;
-      randomSeed?: number;
-    } = {}
-  ): DatasetSplits<T> {
+    options: SplitOptions
+  ): { samples: any[]; indices: SplitIndices } {
     const {
       train = 0.7,
       val = 0.15,
@@ -172,114 +331,157 @@ export class DatasetManager {
     const cacheKey = `${stage}_${train}_${val}_${test}_${stratifyBy}_${randomSeed}`;
     const cache = stage === 1 ? this.stage1Splits : this.stage2Splits;
     
-    if (cache.has(cacheKey)) {
-      return cache.get(cacheKey) as DatasetSplits<T>;
+    const cached = cache.get(cacheKey);
+    if (cached) {
+      return { samples, indices: cached };
     }
     
     // Seed random number generator
     const random = seededRandom(randomSeed);
     
-    let splits: DatasetSplits<any>;
-    if (stratifyBy) {
-      splits = this.stratifiedSplit(samples, train, val, test, stratifyBy, random);
-    } else {
-      splits = this.randomSplit(samples, train, val, test, random);
-    }
+    const indices = stratifyBy
+      ? this.stratifiedSplit(this.getStratifyCodes(samples, stratifyBy), train, val, test, random)
+      : this.randomSplit(samples, train, val, test, random);
     
-    // Cache the splits
-    cache.set(cacheKey, splits);
+    // Cache the split indices
+    cache.set(cacheKey, indices);
     
     // Print split info
     console.log(`\nDataset splits (stage ${stage}):`);
-    console.log(`  train: ${splits.train.length} samples`);
-    console.log(`  val: ${splits.val.length} samples`);
-    console.log(`  test: ${splits.test.length} samples`);
+    console.log(`  train: ${indices.train.length} samples`);
+    console.log(`  val: ${indices.val.length} samples`);
+    console.log(`  test: ${indices.test.length} samples`);
     
-    return splits as DatasetSplits<T>;
+    return { samples, indices };
   }
   
   /**
    * Random split
    */
-  private randomSplit<T>(
-    samples: T[],
+  private randomSplit(
+    samples: unknown[],
     train: number,
     val: number,
     _test: number,
     random: () => number
-  ): DatasetSplits<T> {
-    const shuffled = [...samples].sort(() => random() - 0.5);
+  ): SplitIndices {
+    const shuffled = permutation(samples.length, random);
     
     const n = shuffled.length;
     const trainEnd = Math.floor(n * train);
     const valEnd = trainEnd + Math.floor(n * val);
     
     return {
-      train: shuffled.slice(0, trainEnd),
-      val: shuffled.slice(trainEnd, valEnd),
-      test: shuffled.slice(valEnd),
+      train: shuffled.subarray(0, trainEnd),
+      val: shuffled.subarray(trainEnd, valEnd),
+      test: shuffled.subarray(valEnd),
     };
   }
   
   /**
    * Stratified split maintaining label distribution
    */
-  private stratifiedSplit<T>(
-    samples: T[],
+  private stratifiedSplit(
+    { codes, numGroups }: StratifyCodes,
     train: number,
     val: number,
     _test: number,
-    stratifyField: string,
     random: () => number
-  ): DatasetSplits<T> {
-    // Group by stratify field
-    const groups: Map<string, T[]> = new Map();
-    
-    samples.forEach((sample: any) => {
-      const value = String(sample[stratifyField]);
-      if (!groups.has(value)) {
-        groups.set(value, []);
-      }
-      groups.get(value)!.push(sample);
-    });
+  ): SplitIndices {
+    const n = codes.length;
+    
+    // Counting sort of a random permutation by group code, so each group's
+    // indices end up contiguous and already shuffled
+    const groupStart = new Int32Array(numGroups + 1);
+    for (let i = 0; i < n; i++) {
+      groupStart[codes[i] + 1]++;
+    }
+    for (let g = 0; g < numGroups; g++) {
+      groupStart[g + 1] += groupStart[g];
+    }
+    
+    const cursor = groupStart.slice(0, numGroups);
+    const grouped = new Int32Array(n);
+    for (const i of permutation(n, random)) {
+      grouped[cursor[codes[i]]++] = i;
+    }
     
     // Split each group
-    const trainData: T[] = [];
-    const valData: T[] = [];
-    const testData: T[] = [];
-    
-    groups.forEach((groupSamples) => {
-      const shuffled = [...groupSamples].sort(() => random() - 0.5);
-      const n = shuffled.length;
-      const trainEnd = Math.floor(n * train);
-      const valEnd = trainEnd + Math.floor(n * val);
+    const trainParts: Int32Array[] = [];
+    const valParts: Int32Array[] = [];
+    const testParts: Int32Array[] = [];
+    
+    for (let g = 0; g < numGroups; g++) {
+      const groupEnd = groupStart[g + 1];
+      const size = groupEnd - groupStart[g];
+      const trainEnd = groupStart[g] + Math.floor(size * train);
+      const valEnd = trainEnd + Math.floor(size * val);
       
-      trainData.push(...shuffled.slice(0, trainEnd));
-      valData.push(...shuffled.slice(trainEnd, valEnd));
-      testData.push(...shuffled.slice(valEnd));
-    });
+      trainParts.push(grouped.subarray(groupStart[g], trainEnd));
+      valParts.push(grouped.subarray(trainEnd, valEnd));
+      testParts.push(grouped.subarray(valEnd, groupEnd));
+    }
     
     // Shuffle final splits
     return {
-      train: trainData.sort(() => random() - 0.5),
-      val: valData.sort(() => random() - 0.5),
-      test: testData.sort(() => random() - 0.5),
+      train: concatShuffled(trainParts, random),
+      val: concatShuffled(valParts, random),
+      test: concatShuffled(testParts, random),
     };
   }
   
   /**
-   * Filter dataset by criteria
+   * Get the integer group code of every sample for a stratify field, computing
+   * it once per dataset so splits with other ratios or seeds can reuse it
+   */
+  private getStratifyCodes(samples: any[], field: string): StratifyCodes {
+    let byField = this.stratifyCodes.get(samples);
+    if (!byField) {
+      byField = new Map();
+      this.stratifyCodes.set(samples, byField);
+    }
+    
+    let result = byField.get(field);
+    if (!result) {
+      const getKey = fieldGetter(field);
+      
+      // Enum values are already strings, so raw values serve as map keys
+      const codeByValue: Map<unknown, number> = new Map();
+      const codes = new Int32Array(samples.length);
+      for (let i = 0; i < samples.length; i++) {
+        const value = getKey(samples[i]);
+        let code = codeByValue.get(value);
+        if (code === undefined) {
+          code = codeByValue.size;
+          codeByValue.set(value, code);
+        }
+        codes[i] = code;
+      }
+      
+      result = { codes, numGroups: codeByValue.size };
+      byField.set(field, result);
+    }
+    
+    return result;
+  }
+  
+  /**
+   * Filter dataset by criteria (field names may be dotted, e.g. 'metadata.topic')
    */
   getSubset<T extends Stage1Sample | Stage2Sample>(
     stage: 1 | 2,
     filters: Record<string, any>,
     split?: 'train' | 'val' | 'test'
   ): T[] {
+    let entries = Object.entries(filters);
     let samples: any[];
+    let candidates: Iterable<number>;
     
     if (split) {
-      const splits = this.trainValTestSplit(stage);
-      samples = splits[split];
+      // Walk the cached split indices, keeping split order
+      const splitData = this.getSplitIndices(stage, {});
+      samples = splitData.samples;
+      candidates = splitData.indices[split];
     } else {
       samples = stage === 1 ? this.stage1Data! : this.stage2Data!;
       if (!samples) {
@@ -291,13 +493,71 @@ export class DatasetManager {
           samples = this.stage2Data!;
         }
       }
+      
+      if (entries.length === 0) {
+        return [...samples];
+      }
+      
+      // Start from the smallest index bucket, then check the remaining
+      // filters on those candidates only
+      const buckets = entries.map(
+        ([field, value]) => this.getFieldIndex(samples, field).get(value) ?? []
+      );
+      let best = 0;
+      buckets.forEach((bucket, i) => {
+        if (bucket.length < buckets[best].length) best = i;
+      });
+      
+      candidates = buckets[best];
+      entries = entries.filter((_, i) => i !== best);
+    }
+    
+    // Resolve field accessors once per filter rather than once per sample
+    const compiled = entries.map(([field, value]) => [fieldGetter(field), value] as const);
+    
+    const result: T[] = [];
+    for (const i of candidates) {
+      const sample = samples[i];
+      if (compiled.every(([getValue, value]) => getValue(sample) === value)) {
+        result.push(sample);
+      }
+    }
+    
+    return result;
+  }
+  
+  /**
+   * Get the value -> sample indices index for a field, building it on first use.
+   * Indices are keyed by the sample array itself, so reloading a dataset (which
+   * replaces the array) drops them automatically.
+   */
+  private getFieldIndex(samples: any[], field: string): Map<unknown, number[]> {
+    let byField = this.fieldIndices.get(samples);
+    if (!byField) {
+      byField = new Map();
+      this.fieldIndices.set(samples, byField);
     }
     
-    return samples.filter((sample: any) => {
-      return Object.entries(filters).every(([field, value]) => {
-        return sample[field] === value;
+    let index = byField.get(field);
+    if (!index) {
+      const built: Map<unknown, number[]> = new Map();
+      const getValue = fieldGetter(field);
+      
+      samples.forEach((sample, i) => {
+        const value = getValue(sample);
+        const bucket = built.get(value);
+        if (bucket) {
+          bucket.push(i);
+        } else {
+          built.set(value, [i]);
+        }
       });
-    }) as T[];
+      
+      byField.set(field, built);
+      index = built;
+    }
+    
+    return index;
   }
   
   /**
@@ -322,12 +582,27 @@ export class DatasetManager {
       totalSamples: samples.length,
     };
     
+    // Single pass over the samples per stage, accumulating every distribution
     if (stage === 1) {
       // Stage 1 specific stats
-      const labelCounts = countBy(samples, 'hasClaim');
-      const platformCounts = countBy(samples, 'platform');
-      const topicCounts = countBy(samples, (s: any) => s.metadata.topic || 'other');
-      const complexityCounts = countBy(samples, (s: any) => s.metadata.complexity || 'moderate');
+      const labelCounts: Record<string, number> = {};
+      const platformCounts: Record<string, number> = {};
+      const topicCounts: Record<string, number> = {};
+      const complexityCounts: Record<string, number> = {};
+      let samplesWithClaims = 0;
+      let totalClaims = 0;
+      
+      for (const s of samples as Stage1Sample[]) {
+        increment(labelCounts, String(s.hasClaim));
+        increment(platformCounts, s.platform);
+        increment(topicCounts, s.metadata.topic || 'other');
+        increment(complexityCounts, s.metadata.complexity || 'moderate');
+        
+        if (s.hasClaim) {
+          samplesWithClaims++;
+          totalClaims += s.claims.length;
+        }
+      }
       
       stats.labelDistribution = labelCounts;
       stats.platformDistribution = platformCounts;
@@ -335,27 +610,34 @@ export class DatasetManager {
       stats.complexityDistribution = complexityCounts;
       
       // Claim statistics
-      const samplesWithClaims = samples.filter((s: Stage1Sample) => s.hasClaim);
-      stats.avgClaimsPerSample = samplesWithClaims.length > 0
-        ? samplesWithClaims.reduce((sum, s: Stage1Sample) => sum + s.claims.length, 0) / samplesWithClaims.length
-        : 0;
+      stats.avgClaimsPerSample = samplesWithClaims > 0 ? totalClaims / samplesWithClaims : 0;
     } else {
       // Stage 2 specific stats
-      const verdictCounts = countBy(samples, 'verdict');
-      const topicCounts = countBy(samples, 'topic');
-      const difficultyCounts = countBy(samples, 'difficulty');
+      const verdictCounts: Record<string, number> = {};
+      const topicCounts: Record<string, number> = {};
+      const difficultyCounts: Record<string, number> = {};
+      let totalSources = 0;
+      let totalReliability = 0;
+      
+      for (const s of samples as Stage2Sample[]) {
+        increment(verdictCounts, s.verdict);
+        increment(topicCounts, s.topic);
+        increment(difficultyCounts, s.difficulty);
+        
+        for (const src of s.sources) {
+          totalSources++;
+          totalReliability += src.reliabilityScore;
+        }
+      }
       
       stats.labelDistribution = verdictCounts;
       stats.topicDistribution = topicCounts;
       stats.difficultyDistribution = difficultyCounts;
       
       // Source statistics
-      const totalSources = samples.reduce((sum, s: Stage2Sample) => sum + s.sources.length, 0);
       stats.avgSourcesPerSample = totalSources / samples.length;
-      
-      const sourcesWithReliability = samples.flatMap((s: Stage2Sample) => s.sources);
-      if (sourcesWithReliability.length > 0) {
-        stats.avgSourceReliability = sourcesWithReliability.reduce((sum, src) => sum + src.reliabilityScore, 0) / sourcesWithReliability.length;
+      if (totalSources > 0) {
+        stats.avgSourceReliability = totalReliability / totalSources;
       }
     }
     
@@ -375,20 +657,250 @@ function seededRandom(seed: number): () => number {
 }
 
 /**
- * Count occurrences by field or function
+ * Build an accessor for a possibly dotted field path (e.g. 'metadata.topic').
+ * The path is split once, not per sample.
+ */
+function fieldGetter(field: string): (item: any) => any {
+  const parts = field.split('.');
+  
+  if (parts.length === 1) {
+    return (item) => item[field];
+  }
+  
+  return (item) => {
+    let value = item;
+    for (const part of parts) {
+      value = value?.[part];
+    }
+    return value;
+  };
+}
+
+/**
+ * Random permutation of 0..n-1 (Fisher-Yates) as a typed index array
+ */
+function permutation(n: number, random: () => number): Int32Array {
+  const indices = new Int32Array(n);
+  for (let i = 0; i < n; i++) {
+    indices[i] = i;
+  }
+  
+  for (let i = n - 1; i > 0; i--) {
+    const j = Math.floor(random() * (i + 1));
+    const tmp = indices[i];
+    indices[i] = indices[j];
+    indices[j] = tmp;
+  }
+  
+  return indices;
+}
+
+/**
+ * Concatenate index ranges into a single array, in random order
+ */
+function concatShuffled(parts: Int32Array[], random: () => number): Int32Array {
+  const total = parts.reduce((sum, part) => sum + part.length, 0);
+  const indices = new Int32Array(total);
+  
+  let offset = 0;
+  for (const part of parts) {
+    indices.set(part, offset);
+    offset += part.length;
+  }
+  
+  const order = permutation(total, random);
+  const result = new Int32Array(total);
+  for (let k = 0; k < total; k++) {
+    result[k] = indices[order[k]];
+  }
+  
+  return result;
+}
+
+/**
+ * Collect the samples at the given indices
+ */
+function gather<T>(samples: T[], indices: Int32Array): T[] {
+  const result: T[] = new Array(indices.length);
+  for (let k = 0; k < indices.length; k++) {
+    result[k] = samples[indices[k]];
+  }
+  return result;
+}
+
+/**
+ * Read a file line by line in fixed-size chunks.
+ *
+ * Only one chunk plus the trailing partial line is held in memory at a time.
+ * Chunks are split on the last newline byte so multi-byte UTF-8 characters are
+ * never cut in half.
  */
-function countBy<T>(array: T[], keyOrFn: string | ((item: T) => any)): Record<string, number> {
-  const counts: Record<string, number> = {};
+function* readLines(filepath: string, chunkBytes: number = 1 << 20): Generator<string> {
+  const fd = fs.openSync(filepath, 'r');
+  const chunk = Buffer.allocUnsafe(chunkBytes);
+  let carry: Buffer = Buffer.alloc(0);
   
-  array.forEach((item) => {
-    const key = typeof keyOrFn === 'function'
-      ? String(keyOrFn(item))
-      : String((item as any)[keyOrFn]);
+  try {
+    let bytesRead: number;
+    while ((bytesRead = fs.readSync(fd, chunk, 0, chunkBytes, null)) > 0) {
+      const data = carry.length > 0
+        ? Buffer.concat([carry, chunk.subarray(0, bytesRead)])
+        : chunk.subarray(0, bytesRead);
+      
+      const lastNewline = data.lastIndexOf(0x0a);
+      if (lastNewline === -1) {
+        carry = Buffer.from(data);
+        continue;
+      }
+      
+      yield* data.toString('utf-8', 0, lastNewline).split('\n');
+      
+      // Copy the remainder: `chunk` is reused on the next read
+      carry = Buffer.from(data.subarray(lastNewline + 1));
+    }
     
-    counts[key] = (counts[key] || 0) + 1;
-  });
+    if (carry.length > 0) {
+      yield carry.toString('utf-8');
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+const QUOTE = 0x22;
+const BACKSLASH = 0x5c;
+const COMMA = 0x2c;
+const OPEN_BRACKET = 0x5b;
+const CLOSE_BRACKET = 0x5d;
+const OPEN_BRACE = 0x7b;
+const CLOSE_BRACE = 0x7d;
+
+/**
+ * Iterate over the items of a top-level JSON array without loading the file.
+ *
+ * Scans the file in fixed-size chunks, tracking string and nesting state to
+ * find item boundaries. String bodies are skipped with native Buffer.indexOf
+ * searches rather than byte by byte, and all items completed within a chunk
+ * are parsed together with a single JSON.parse call (the batching model of
+ * simdjson's JsonStream), so memory stays bounded by the chunk size.
+ */
+function* readJsonArrayItems(filepath: string, chunkBytes: number = 1 << 20): Generator<any> {
+  const fd = fs.openSync(filepath, 'r');
+  const chunk = Buffer.allocUnsafe(chunkBytes);
+  const pending: Buffer[] = [];
+  let depth = 0;
+  let inString = false;
+  let escaped = false;
+  let inItem = false;
   
-  return counts;
+  try {
+    let bytesRead: number;
+    while ((bytesRead = fs.readSync(fd, chunk, 0, chunkBytes, null)) > 0) {
+      const data = chunk.subarray(0, bytesRead);
+      let itemStart = 0;
+      let batchStart = inItem ? 0 : -1;
+      let batchEnd = -1;
+      
+      // Next quote/backslash positions, advanced lazily so each byte is
+      // searched at most once
+      let quoteAt = data.indexOf(QUOTE);
+      let backslashAt = data.indexOf(BACKSLASH);
+      
+      // Previous chunk ended on a backslash inside a string: skip the escaped byte
+      let i = escaped ? 1 : 0;
+      escaped = false;
+      
+      while (i < bytesRead) {
+        if (inString) {
+          if (quoteAt !== -1 && quoteAt < i) quoteAt = data.indexOf(QUOTE, i);
+          if (backslashAt !== -1 && backslashAt < i) backslashAt = data.indexOf(BACKSLASH, i);
+          
+          if (backslashAt !== -1 && (quoteAt === -1 || backslashAt < quoteAt)) {
+            i = backslashAt + 2;
+          } else if (quoteAt === -1) {
+            i = bytesRead;
+          } else {
+            inString = false;
+            i = quoteAt + 1;
+          }
+          continue;
+        }
+        
+        const c = data[i];
+        
+        if (!isJsonWhitespace(c)) {
+          if (depth === 0 && c !== OPEN_BRACKET) {
+            throw new Error(`${filepath} does not contain a JSON array`);
+          }
+          
+          if (depth === 1 && !inItem && c !== COMMA && c !== CLOSE_BRACKET) {
+            inItem = true;
+            itemStart = i;
+            if (batchStart === -1) batchStart = i;
+          }
+          
+          if (c === QUOTE) {
+            inString = true;
+          } else if (c === OPEN_BRACE || c === OPEN_BRACKET) {
+            depth++;
+          } else if (c === CLOSE_BRACE || c === CLOSE_BRACKET) {
+            depth--;
+            if (depth === 0 && inItem) {
+              inItem = false;
+              batchEnd = i;
+            }
+          } else if (c === COMMA && depth === 1) {
+            inItem = false;
+            batchEnd = i;
+          }
+        }
+        
+        i++;
+      }
+      
+      // An escape at the very end of the chunk applies to the next one
+      escaped = i > bytesRead;
+      
+      // Everything from batchStart to batchEnd is "item, item, ..."
+      if (batchEnd !== -1) {
+        yield* parseBatch(pending, data.subarray(batchStart, batchEnd));
+      }
+      
+      // Item continues in the next chunk; copy since `chunk` is reused
+      if (inItem) {
+        pending.push(Buffer.from(data.subarray(itemStart, bytesRead)));
+      }
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+function isJsonWhitespace(c: number): boolean {
+  return c === 0x20 || c === 0x0a || c === 0x0d || c === 0x09;
+}
+
+function parseBatch(pending: Buffer[], tail: Buffer): any[] {
+  const bytes = pending.length > 0 ? Buffer.concat([...pending, tail]) : tail;
+  pending.length = 0;
+  return JSON.parse(`[${bytes.toString('utf-8')}]`);
+}
+
+/**
+ * Serialize samples as JSONL for .jsonl paths, a JSON array otherwise
+ */
+function serializeSamples(samples: unknown[], filepath: string, pretty: boolean = false): string {
+  if (filepath.endsWith('.jsonl')) {
+    return samples.map((sample) => JSON.stringify(sample)).join('\n') + '\n';
+  }
+  return pretty ? JSON.stringify(samples, null, 2) : JSON.stringify(samples);
+}
+
+/**
+ * Increment the count for a key
+ */
+function increment(counts: Record<string, number>, key: string): void {
+  counts[key] = (counts[key] || 0) + 1;
 }
 
 /**
@@ -476,8 +988,8 @@ export function createExampleDatasets(dataDir: string = './datasets'): void {
   ];
   
   // Save datasets
-  manager.saveStage1(stage1Samples, 'stage1_example.json');
-  manager.saveStage2(stage2Samples, 'stage2_example.json');
+  manager.saveStage1(stage1Samples, 'stage1_example.json', { pretty: true });
+  manager.saveStage2(stage2Samples, 'stage2_example.json', { pretty: true });
   
   console.log('\nExample datasets created successfully!');
   console.log(`Location: ${dataDir}`);
@@ -35,37 +35,44 @@ export interface Stage1Metrics {
 }
 
 export class Stage1Evaluator {
+  /**
+   * @param columns - Columns for exactly these predictions, e.g. filled by
+   *   setPredictionRow from runBatch's onPrediction callback. Built from the
+   *   predictions when omitted.
+   */
   evaluate(
     predictions: ModelPrediction[],
-    groundTruth: Stage1Sample[]
+    groundTruth: Stage1Sample[],
+    columns: PredictionColumns = predictionColumns(predictions)
   ): Stage1Metrics {
     // Match predictions to ground truth
-    const gtMap = new Map(groundTruth.map((s) => [s.id, s]));
-    const matched: Array<[ModelPrediction, Stage1Sample]> = [];
-    
-    for (const pred of predictions) {
-      const gt = gtMap.get(pred.sampleId);
-      if (gt) {
-        matched.push([pred, gt]);
-      }
-    }
+    const matched = matchPredictions(predictions, groundTruth);
     
     if (matched.length === 0) {
       throw new Error('No matching predictions found');
     }
     
-    // Extract predictions and labels
-    const yPred = matched.map(([p]) => Boolean(p.prediction));
-    const yTrue = matched.map(([, gt]) => gt.hasClaim);
+    // Extract predictions and labels as 0/1 bytes
+    const n = matched.length;
+    const yPred = new Uint8Array(n);
+    const yTrue = new Uint8Array(n);
+    const correct = new Uint8Array(n);
+    
+    for (let i = 0; i < n; i++) {
+      const [pred, gt] = matched[i];
+      yPred[i] = pred.prediction ? 1 : 0;
+      yTrue[i] = gt.hasClaim ? 1 : 0;
+      correct[i] = yPred[i] === yTrue[i] ? 1 : 0;
+    }
     
     // Calculate classification metrics
     const classMetrics = this.calculateClassificationMetrics(yPred, yTrue);
     
     // Calculate performance metrics
-    const perfMetrics = this.calculatePerformanceMetrics(predictions);
+    const perfMetrics = performanceMetrics(columns);
     
     // Error analysis
-    const errorAnalysis = this.analyzeErrors(matched, yPred, yTrue);
+    const errorAnalysis = this.analyzeErrors(matched, correct);
     
     return {
       ...classMetrics,
@@ -75,13 +82,24 @@ export class Stage1Evaluator {
   }
   
   private calculateClassificationMetrics(
-    yPred: boolean[],
-    yTrue: boolean[]
+    yPred: Uint8Array,
+    yTrue: Uint8Array
   ): Omit<Stage1Metrics, 'meanLatency' | 'p90Latency' | 'p95Latency' | 'p99Latency' | 'totalCost' | 'meanCostPerSample' | 'errorAnalysis'> {
-    const tp = yPred.filter((p, i) => p && yTrue[i]).length;
-    const fp = yPred.filter((p, i) => p && !yTrue[i]).length;
-    const tn = yPred.filter((p, i) => !p && !yTrue[i]).length;
-    const fn = yPred.filter((p, i) => !p && yTrue[i]).length;
+    // Binary labels: the whole confusion matrix follows from three popcounts
+    // over the packed bits, |pred & true|, |pred| and |true|
+    const predBits = packBits(yPred);
+    const trueBits = packBits(yTrue);
+    let tp = 0;
+    let predicted = 0;
+    let actual = 0;
+    for (let w = 0; w < predBits.length; w++) {
+      tp += popcount32(predBits[w] & trueBits[w]);
+      predicted += popcount32(predBits[w]);
+      actual += popcount32(trueBits[w]);
+    }
+    const fp = predicted - tp;
+    const fn = actual - tp;
+    const tn = yPred.length - tp - fp - fn;
     
     const precision = tp + fp > 0 ? tp / (tp + fp) : 0;
     const recall = tp + fn > 0 ? tp / (tp + fn) : 0;
@@ -105,71 +123,11 @@ export class Stage1Evaluator {
     };
   }
   
-  private calculatePerformanceMetrics(predictions: ModelPrediction[]): {
-    meanLatency: number;
-    p90Latency: number;
-    p95Latency: number;
-    p99Latency: number;
-    totalCost: number;
-    meanCostPerSample: number;
-  } {
-    const latencies = predictions.map((p) => p.latency).filter((l) => l > 0);
-    const costs = predictions.map((p) => p.cost).filter((c) => c > 0);
-    
-    const sortedLatencies = [...latencies].sort((a, b) => a - b);
-    
-    return {
-      meanLatency: mean(latencies),
-      p90Latency: percentile(sortedLatencies, 90),
-      p95Latency: percentile(sortedLatencies, 95),
-      p99Latency: percentile(sortedLatencies, 99),
-      totalCost: sum(costs),
-      meanCostPerSample: mean(costs),
-    };
-  }
-  
   private analyzeErrors(
     matched: Array<[ModelPrediction, Stage1Sample]>,
-    yPred: boolean[],
-    yTrue: boolean[]
+    correct: Uint8Array
   ): Record<string, any> {
-    const byPlatform: Record<string, { correct: number; total: number }> = {};
-    const byTopic: Record<string, { correct: number; total: number }> = {};
-    
-    matched.forEach(([, sample], i) => {
-      const correct = yPred[i] === yTrue[i];
-      
-      // By platform
-      const platform = sample.platform as string;
-      if (!byPlatform[platform]) {
-        byPlatform[platform] = { correct: 0, total: 0 };
-      }
-      byPlatform[platform].total++;
-      if (correct) byPlatform[platform].correct++;
-      
-      // By topic
-      const topic = (sample.metadata?.topic as string) || 'other';
-      if (!byTopic[topic]) {
-        byTopic[topic] = { correct: 0, total: 0 };
-      }
-      byTopic[topic].total++;
-      if (correct) byTopic[topic].correct++;
-    });
-    
-    return {
-      byPlatform: Object.fromEntries(
-        Object.entries(byPlatform).map(([k, v]) => [
-          k,
-          { accuracy: v.correct / v.total, ...v },
-        ])
-      ),
-      byTopic: Object.fromEntries(
-        Object.entries(byTopic).map(([k, v]) => [
-          k,
-          { accuracy: v.correct / v.total, ...v },
-        ])
-      ),
-    };
+    return analyzeByCategory(matched, correct, STAGE1_CATEGORIES);
   }
 }
 
@@ -202,39 +160,57 @@ export interface Stage2Metrics {
 }
 
 export class Stage2Evaluator {
+  /**
+   * @param columns - Columns for exactly these predictions, e.g. filled by
+   *   setPredictionRow from runBatch's onPrediction callback. Built from the
+   *   predictions when omitted.
+   */
   evaluate(
     predictions: ModelPrediction[],
-    groundTruth: Stage2Sample[]
+    groundTruth: Stage2Sample[],
+    columns: PredictionColumns = predictionColumns(predictions)
   ): Stage2Metrics {
     // Match predictions to ground truth
-    const gtMap = new Map(groundTruth.map((s) => [s.id, s]));
-    const matched: Array<[ModelPrediction, Stage2Sample]> = [];
-    
-    for (const pred of predictions) {
-      const gt = gtMap.get(pred.sampleId);
-      if (gt) {
-        matched.push([pred, gt]);
-      }
-    }
+    const matched = matchPredictions(predictions, groundTruth);
     
     if (matched.length === 0) {
       throw new Error('No matching predictions found');
     }
     
-    // Extract predictions and labels
-    const yPred = matched.map(([p]) => String(p.prediction).toLowerCase());
-    const yTrue = matched.map(([, gt]) => gt.verdict);
-    const confidences = matched.map(([p]) => p.confidence);
+    // Extract predictions and labels in one pass, encoded as label codes
+    const n = matched.length;
+    const yPred = new Int32Array(n);
+    const yTrue = new Int32Array(n);
+    const confidences = new Float64Array(n);
+    const encode = createLabelEncoder();
+    
+    for (let i = 0; i < n; i++) {
+      const [pred, gt] = matched[i];
+      yPred[i] = encode(verdictLabel(pred.prediction));
+      yTrue[i] = encode(gt.verdict);
+      confidences[i] = pred.confidence;
+    }
+    
+    // One correctness mask feeds accuracy, calibration and error analysis
+    const correct = new Uint8Array(n);
+    let correctCount = 0;
+    for (let i = 0; i < n; i++) {
+      if (yPred[i] === yTrue[i]) {
+        correct[i] = 1;
+        correctCount++;
+      }
+    }
     
     // Calculate metrics
-    const accuracy = yPred.filter((p, i) => p === yTrue[i]).length / yPred.length;
-    const perClass = this.calculatePerClassMetrics(yPred, yTrue);
-    const confusionMatrix = this.buildConfusionMatrix(yPred, yTrue);
-    const criticalErrors = this.calculateCriticalErrors(yPred, yTrue);
-    const calibration = this.calculateCalibration(yPred, yTrue, confidences);
+    const accuracy = correctCount / n;
+    const counts = countLabelPairs(yPred, yTrue);
+    const perClass = this.calculatePerClassMetrics(counts);
+    const confusionMatrix = this.buildConfusionMatrix(counts);
+    const criticalErrors = this.calculateCriticalErrors(counts, n);
+    const calibration = this.calculateCalibration(correct, confidences);
     const sourceQuality = this.calculateSourceQuality(matched);
-    const perfMetrics = this.calculatePerformanceMetrics(predictions);
-    const errorAnalysis = this.analyzeErrors(matched, yPred, yTrue);
+    const { meanLatency, p90Latency, totalCost, meanCostPerSample } = performanceMetrics(columns);
+    const errorAnalysis = this.analyzeErrors(matched, correct);
     
     return {
       accuracy,
@@ -243,58 +219,64 @@ export class Stage2Evaluator {
       criticalErrors,
       calibration,
       sourceQuality,
-      ...perfMetrics,
+      meanLatency,
+      p90Latency,
+      totalCost,
+      meanCostPerSample,
       errorAnalysis,
     };
   }
   
   private calculatePerClassMetrics(
-    yPred: string[],
-    yTrue: string[]
+    counts: Int32Array
   ): Record<string, { precision: number; recall: number; f1Score: number; support: number }> {
-    const labels = ['true', 'false', 'unknown'];
     const result: Record<string, any> = {};
     
-    for (const label of labels) {
-      const tp = yPred.filter((p, i) => p === label && yTrue[i] === label).length;
-      const fp = yPred.filter((p, i) => p === label && yTrue[i] !== label).length;
-      const fn = yPred.filter((p, i) => p !== label && yTrue[i] === label).length;
+    for (let l = 0; l < STAGE2_LABELS.length; l++) {
+      // Row/column sums include the catch-all code, so unexpected labels
+      // still count against precision and recall
+      let rowSum = 0;
+      let colSum = 0;
+      for (let k = 0; k < LABEL_CODES; k++) {
+        rowSum += counts[l * LABEL_CODES + k];
+        colSum += counts[k * LABEL_CODES + l];
+      }
+      const tp = counts[l * LABEL_CODES + l];
+      const fp = colSum - tp;
+      const fn = rowSum - tp;
       
       const precision = tp + fp > 0 ? tp / (tp + fp) : 0;
       const recall = tp + fn > 0 ? tp / (tp + fn) : 0;
       const f1Score = precision + recall > 0 ? (2 * precision * recall) / (precision + recall) : 0;
-      const support = yTrue.filter((t) => t === label).length;
       
-      result[label] = { precision, recall, f1Score, support };
+      result[STAGE2_LABELS[l]] = { precision, recall, f1Score, support: rowSum };
     }
     
     return result;
   }
   
-  private buildConfusionMatrix(
-    yPred: string[],
-    yTrue: string[]
-  ): Record<string, Record<string, number>> {
-    const labels = ['true', 'false', 'unknown'];
+  private buildConfusionMatrix(counts: Int32Array): Record<string, Record<string, number>> {
     const matrix: Record<string, Record<string, number>> = {};
     
-    for (const trueLabel of labels) {
-      matrix[trueLabel] = {};
-      for (const predLabel of labels) {
-        matrix[trueLabel][predLabel] = yPred.filter(
-          (p, i) => p === predLabel && yTrue[i] === trueLabel
-        ).length;
+    for (let t = 0; t < STAGE2_LABELS.length; t++) {
+      const row: Record<string, number> = {};
+      for (let p = 0; p < STAGE2_LABELS.length; p++) {
+        row[STAGE2_LABELS[p]] = counts[t * LABEL_CODES + p];
       }
+      matrix[STAGE2_LABELS[t]] = row;
     }
     
     return matrix;
   }
   
-  private calculateCriticalErrors(yPred: string[], yTrue: string[]): Stage2Metrics['criticalErrors'] {
-    const trueMarkedFalse = yPred.filter((p, i) => p === 'false' && yTrue[i] === 'true').length;
-    const falseMarkedTrue = yPred.filter((p, i) => p === 'true' && yTrue[i] === 'false').length;
+  private calculateCriticalErrors(
+    counts: Int32Array,
+    total: number
+  ): Stage2Metrics['criticalErrors'] {
+    const trueMarkedFalse = counts[TRUE_CODE * LABEL_CODES + FALSE_CODE];
+    const falseMarkedTrue = counts[FALSE_CODE * LABEL_CODES + TRUE_CODE];
     const totalCriticalErrors = trueMarkedFalse + falseMarkedTrue;
-    const criticalErrorRate = totalCriticalErrors / yPred.length;
+    const criticalErrorRate = totalCriticalErrors / total;
     
     return {
       trueMarkedFalse,
@@ -305,40 +287,47 @@ export class Stage2Evaluator {
   }
   
   private calculateCalibration(
-    yPred: string[],
-    yTrue: string[],
-    confidences: number[]
+    correct: Uint8Array,
+    confidences: Float64Array
   ): Stage2Metrics['calibration'] {
-    const bins = [0.5, 0.6, 0.7, 0.8, 0.9, 1.0];
+    const numBins = CALIBRATION_BINS.length - 1;
     const calibrationByBin: Record<string, any> = {};
     
-    for (let i = 0; i < bins.length - 1; i++) {
-      const low = bins[i];
-      const high = bins[i + 1];
+    // Accumulate per-bin counts and sums in a single pass over the samples
+    const counts = new Int32Array(numBins);
+    const correctCounts = new Int32Array(numBins);
+    const confidenceSums = new Float64Array(numBins);
+    
+    for (let idx = 0; idx < confidences.length; idx++) {
+      const c = confidences[idx];
+      const b = binIndex(CALIBRATION_BINS, c);
+      if (b < 0) continue;
       
-      const inBin = confidences
-        .map((c, idx) => ({ c, idx }))
-        .filter(({ c }) => c >= low && c < high);
+      counts[b]++;
+      confidenceSums[b] += c;
+      correctCounts[b] += correct[idx];
+    }
+    
+    let weightedError = 0;
+    for (let i = 0; i < numBins; i++) {
+      const samples = counts[i];
       
-      if (inBin.length > 0) {
-        const actualAccuracy =
-          inBin.filter(({ idx }) => yPred[idx] === yTrue[idx]).length / inBin.length;
-        const expectedConfidence = mean(inBin.map(({ c }) => c));
+      if (samples > 0) {
+        const actualAccuracy = correctCounts[i] / samples;
+        const expectedConfidence = confidenceSums[i] / samples;
+        const calibrationError = Math.abs(expectedConfidence - actualAccuracy);
         
-        calibrationByBin[`${low.toFixed(1)}-${high.toFixed(1)}`] = {
+        calibrationByBin[CALIBRATION_BIN_LABELS[i]] = {
           expected: expectedConfidence,
           actual: actualAccuracy,
-          samples: inBin.length,
-          calibrationError: Math.abs(expectedConfidence - actualAccuracy),
+          samples,
+          calibrationError,
         };
+        weightedError += calibrationError * samples;
       }
     }
     
-    const ece =
-      Object.values(calibrationByBin).reduce(
-        (sum: number, bin: any) => sum + bin.calibrationError * bin.samples,
-        0
-      ) / confidences.length;
+    const ece = weightedError / confidences.length;
     
     return {
       expectedCalibrationError: ece,
@@ -349,108 +338,363 @@ export class Stage2Evaluator {
   private calculateSourceQuality(
     matched: Array<[ModelPrediction, Stage2Sample]>
   ): Stage2Metrics['sourceQuality'] {
-    const overlaps: number[] = [];
-    const reliabilities: number[] = [];
-    const sourceCounts: number[] = [];
+    // Running sums instead of per-pair arrays; each average divides once
+    let overlapSum = 0;
+    let overlapCount = 0;
+    let reliabilitySum = 0;
+    let sourceSum = 0;
+    let withSources = 0;
     
     for (const [pred, gt] of matched) {
-      const predUrls = new Set(pred.sources.map((s) => s.url));
-      const gtUrls = new Set(gt.sources.map((s) => s.url));
-      
-      if (gtUrls.size > 0) {
-        const overlap = [...predUrls].filter((url) => gtUrls.has(url)).length / gtUrls.size;
-        overlaps.push(overlap);
+      if (gt.sources.length > 0) {
+        const gtUrls = new Set<string>();
+        for (const s of gt.sources) gtUrls.add(s.url);
+        const gtSize = gtUrls.size;
+        
+        // Deleting on hit counts each shared URL once, however often it repeats
+        let shared = 0;
+        for (const s of pred.sources) {
+          if (gtUrls.delete(s.url)) shared++;
+        }
+        overlapSum += shared / gtSize;
+        overlapCount++;
       }
       
       if (pred.sources.length > 0) {
-        const avgReliability = mean(pred.sources.map((s) => s.reliabilityScore || 0.7));
-        reliabilities.push(avgReliability);
-        sourceCounts.push(pred.sources.length);
+        let totalReliability = 0;
+        for (const s of pred.sources) {
+          totalReliability += s.reliabilityScore || 0.7;
+        }
+        reliabilitySum += totalReliability / pred.sources.length;
+        sourceSum += pred.sources.length;
+        withSources++;
       }
     }
     
     return {
-      avgSourceOverlap: mean(overlaps),
-      avgSourceReliability: mean(reliabilities),
-      avgSourcesPerPrediction: mean(sourceCounts),
-    };
-  }
-  
-  private calculatePerformanceMetrics(predictions: ModelPrediction[]): {
-    meanLatency: number;
-    p90Latency: number;
-    totalCost: number;
-    meanCostPerSample: number;
-  } {
-    const latencies = predictions.map((p) => p.latency).filter((l) => l > 0);
-    const costs = predictions.map((p) => p.cost).filter((c) => c > 0);
-    
-    const sortedLatencies = [...latencies].sort((a, b) => a - b);
-    
-    return {
-      meanLatency: mean(latencies),
-      p90Latency: percentile(sortedLatencies, 90),
-      totalCost: sum(costs),
-      meanCostPerSample: mean(costs),
+      avgSourceOverlap: overlapCount > 0 ? overlapSum / overlapCount : 0,
+      avgSourceReliability: withSources > 0 ? reliabilitySum / withSources : 0,
+      avgSourcesPerPrediction: withSources > 0 ? sourceSum / withSources : 0,
     };
   }
   
   private analyzeErrors(
     matched: Array<[ModelPrediction, Stage2Sample]>,
-    yPred: string[],
-    yTrue: string[]
+    correct: Uint8Array
   ): Record<string, any> {
-    const byDifficulty: Record<string, { correct: number; total: number }> = {};
-    const byTopic: Record<string, { correct: number; total: number }> = {};
-    
-    matched.forEach(([, sample], i) => {
-      const correct = yPred[i] === yTrue[i];
-      
-      // By difficulty
-      const difficulty = sample.difficulty as string;
-      if (!byDifficulty[difficulty]) {
-        byDifficulty[difficulty] = { correct: 0, total: 0 };
+    return analyzeByCategory(matched, correct, STAGE2_CATEGORIES);
+  }
+}
+
+// ===== Utility Functions =====
+
+/**
+ * Pair each prediction with its ground-truth sample, in prediction order.
+ * Batch runs emit predictions in dataset order, so that case is zipped
+ * directly; anything else falls back to an id lookup.
+ */
+function matchPredictions<T extends { id: string }>(
+  predictions: ModelPrediction[],
+  groundTruth: T[]
+): Array<[ModelPrediction, T]> {
+  if (predictions.length === groundTruth.length) {
+    const zipped: Array<[ModelPrediction, T]> = new Array(predictions.length);
+    let aligned = true;
+    for (let i = 0; i < predictions.length; i++) {
+      if (predictions[i].sampleId !== groundTruth[i].id) {
+        aligned = false;
+        break;
       }
-      byDifficulty[difficulty].total++;
-      if (correct) byDifficulty[difficulty].correct++;
-      
-      // By topic
-      const topic = sample.topic as string;
-      if (!byTopic[topic]) {
-        byTopic[topic] = { correct: 0, total: 0 };
+      zipped[i] = [predictions[i], groundTruth[i]];
+    }
+    if (aligned) return zipped;
+  }
+  
+  const gtMap = new Map(groundTruth.map((s) => [s.id, s]));
+  const matched: Array<[ModelPrediction, T]> = [];
+  
+  for (const pred of predictions) {
+    const gt = gtMap.get(pred.sampleId);
+    if (gt) {
+      matched.push([pred, gt]);
+    }
+  }
+  
+  return matched;
+}
+
+/**
+ * Normalize a Stage 2 prediction to a lowercase label.
+ * A single switch on the runtime type lets the common cases skip String().
+ */
+function verdictLabel(prediction: ModelPrediction['prediction']): string {
+  switch (typeof prediction) {
+    case 'string':
+      return prediction.toLowerCase();
+    case 'boolean':
+      return prediction ? 'true' : 'false';
+    default:
+      return String(prediction).toLowerCase();
+  }
+}
+
+const STAGE2_LABELS = ['true', 'false', 'unknown'];
+const TRUE_CODE = 0;
+const FALSE_CODE = 1;
+const UNKNOWN_CODE = 2;
+const OTHER_CODE = 3;
+/** Known labels plus one catch-all code for anything else */
+const LABEL_CODES = STAGE2_LABELS.length + 1;
+
+/**
+ * Create an encoder from Stage 2 labels to integer codes. Known labels get
+ * fixed codes; every other distinct string gets its own code from OTHER_CODE
+ * upwards, so equal codes always mean equal labels.
+ */
+function createLabelEncoder(): (label: string) => number {
+  const others = new Map<string, number>();
+  
+  return (label) => {
+    switch (label) {
+      case 'true':
+        return TRUE_CODE;
+      case 'false':
+        return FALSE_CODE;
+      case 'unknown':
+        return UNKNOWN_CODE;
+      default: {
+        let code = others.get(label);
+        if (code === undefined) {
+          code = OTHER_CODE + others.size;
+          others.set(label, code);
+        }
+        return code;
       }
-      byTopic[topic].total++;
-      if (correct) byTopic[topic].correct++;
-    });
-    
-    return {
-      byDifficulty: Object.fromEntries(
-        Object.entries(byDifficulty).map(([k, v]) => [
-          k,
-          { accuracy: v.correct / v.total, ...v },
-        ])
-      ),
-      byTopic: Object.fromEntries(
-        Object.entries(byTopic).map(([k, v]) => [
-          k,
-          { accuracy: v.correct / v.total, ...v },
-        ])
-      ),
-    };
+    }
+  };
+}
+
+/**
+ * Count (true label, predicted label) pairs in one pass.
+ * Returns a row-major LABEL_CODES x LABEL_CODES matrix indexed by true code,
+ * with all unexpected labels folded into the catch-all code.
+ */
+function countLabelPairs(yPred: Int32Array, yTrue: Int32Array): Int32Array {
+  const counts = new Int32Array(LABEL_CODES * LABEL_CODES);
+  for (let i = 0; i < yPred.length; i++) {
+    const t = Math.min(yTrue[i], OTHER_CODE);
+    const p = Math.min(yPred[i], OTHER_CODE);
+    counts[t * LABEL_CODES + p]++;
   }
+  return counts;
 }
 
-// ===== Utility Functions =====
+/**
+ * Pack 0/1 bytes into 32-bit words, 32 labels per word.
+ */
+function packBits(bits: Uint8Array): Uint32Array {
+  const words = new Uint32Array((bits.length + 31) >>> 5);
+  for (let i = 0; i < bits.length; i++) {
+    if (bits[i]) words[i >>> 5] |= 1 << (i & 31);
+  }
+  return words;
+}
 
-function mean(arr: number[]): number {
-  return arr.length > 0 ? arr.reduce((a, b) => a + b, 0) / arr.length : 0;
+/** Number of set bits in a 32-bit word (SWAR popcount) */
+function popcount32(x: number): number {
+  x -= (x >>> 1) & 0x55555555;
+  x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+  x = (x + (x >>> 4)) & 0x0f0f0f0f;
+  return Math.imul(x, 0x01010101) >>> 24;
 }
 
-function sum(arr: number[]): number {
-  return arr.reduce((a, b) => a + b, 0);
+/**
+ * Numeric prediction fields laid out column-wise, so aggregations scan flat
+ * typed arrays instead of chasing one object per prediction.
+ */
+export interface PredictionColumns {
+  latency: Float64Array;
+  cost: Float64Array;
+  confidence: Float64Array;
+  tokensUsed: Float64Array;
+}
+
+/**
+ * Allocate zeroed columns for n predictions
+ */
+export function createPredictionColumns(n: number): PredictionColumns {
+  return {
+    latency: new Float64Array(n),
+    cost: new Float64Array(n),
+    confidence: new Float64Array(n),
+    tokensUsed: new Float64Array(n),
+  };
+}
+
+/**
+ * Write one prediction into row i of the columns
+ */
+export function setPredictionRow(
+  columns: PredictionColumns,
+  i: number,
+  prediction: ModelPrediction
+): void {
+  columns.latency[i] = prediction.latency;
+  columns.cost[i] = prediction.cost;
+  columns.confidence[i] = prediction.confidence;
+  columns.tokensUsed[i] = prediction.metadata?.tokensUsed ?? 0;
+}
+
+/**
+ * Build the columns for a predictions array in one pass
+ */
+export function predictionColumns(predictions: ModelPrediction[]): PredictionColumns {
+  const columns = createPredictionColumns(predictions.length);
+  for (let i = 0; i < predictions.length; i++) {
+    setPredictionRow(columns, i, predictions[i]);
+  }
+  return columns;
+}
+
+/** Confidence bin edges for calibration; each bin is [low, high) */
+const CALIBRATION_BINS = [0.5, 0.6, 0.7, 0.8, 0.9, 1.0];
+const CALIBRATION_BIN_LABELS = CALIBRATION_BINS.slice(0, -1).map(
+  (low, i) => `${low.toFixed(1)}-${CALIBRATION_BINS[i + 1].toFixed(1)}`
+);
+
+/**
+ * Index of the [edges[i], edges[i + 1]) bin containing value, found by
+ * binary search so any sorted edge list works. Returns -1 when out of range.
+ */
+function binIndex(edges: number[], value: number): number {
+  if (!(value >= edges[0] && value < edges[edges.length - 1])) return -1;
+  
+  let lo = 0;
+  let hi = edges.length - 1;
+  while (hi - lo > 1) {
+    const mid = (lo + hi) >> 1;
+    if (value >= edges[mid]) lo = mid;
+    else hi = mid;
+  }
+  return lo;
 }
 
-function percentile(sorted: number[], p: number): number {
+/**
+ * Latency and cost metrics shared by both stages.
+ * Positive latencies and costs are collected in one pass; latencies are
+ * sorted once so every percentile indexes into the same array.
+ */
+function performanceMetrics({
+  latency,
+  cost,
+}: PredictionColumns): Pick<
+  Stage1Metrics,
+  'meanLatency' | 'p90Latency' | 'p95Latency' | 'p99Latency' | 'totalCost' | 'meanCostPerSample'
+> {
+  const latencies = new Float64Array(latency.length);
+  let latencyCount = 0;
+  let latencyTotal = 0;
+  let costCount = 0;
+  let totalCost = 0;
+  
+  for (let i = 0; i < latency.length; i++) {
+    const l = latency[i];
+    if (l > 0) {
+      latencies[latencyCount++] = l;
+      latencyTotal += l;
+    }
+    const c = cost[i];
+    if (c > 0) {
+      costCount++;
+      totalCost += c;
+    }
+  }
+  
+  // Typed arrays sort numerically without a comparator
+  const sortedLatencies = latencies.subarray(0, latencyCount).sort();
+  
+  return {
+    meanLatency: latencyCount > 0 ? latencyTotal / latencyCount : 0,
+    p90Latency: percentile(sortedLatencies, 90),
+    p95Latency: percentile(sortedLatencies, 95),
+    p99Latency: percentile(sortedLatencies, 99),
+    totalCost,
+    meanCostPerSample: costCount > 0 ? totalCost / costCount : 0,
+  };
+}
+
+/**
+ * Category accessors for error analysis, keyed by output field.
+ * Defined once at module level rather than re-created per evaluation.
+ */
+const STAGE1_CATEGORIES: Record<string, (sample: Stage1Sample) => string> = {
+  byPlatform: (sample) => sample.platform as string,
+  byTopic: (sample) => (sample.metadata?.topic as string) || 'other',
+};
+
+const STAGE2_CATEGORIES: Record<string, (sample: Stage2Sample) => string> = {
+  byDifficulty: (sample) => sample.difficulty as string,
+  byTopic: (sample) => sample.topic as string,
+};
+
+/**
+ * Accuracy broken down by each category in the accessor table.
+ */
+function analyzeByCategory<T>(
+  matched: Array<[ModelPrediction, T]>,
+  correct: Uint8Array,
+  categories: Record<string, (sample: T) => string>
+): Record<string, any> {
+  const n = matched.length;
+  const result: Record<string, any> = {};
+  for (const [field, category] of Object.entries(categories)) {
+    const values: string[] = new Array(n);
+    for (let i = 0; i < n; i++) {
+      values[i] = category(matched[i][1]);
+    }
+    result[field] = accuracyByCategory(values, correct);
+  }
+  return result;
+}
+
+/**
+ * Per-category accuracy. Each distinct value gets an integer code on first
+ * sight; totals are then scattered into typed accumulators sized to the
+ * number of distinct values.
+ */
+function accuracyByCategory(
+  categories: string[],
+  correct: Uint8Array
+): Record<string, { accuracy: number; correct: number; total: number }> {
+  const codes = new Map<string, number>();
+  const inverse = new Int32Array(categories.length);
+  
+  for (let i = 0; i < categories.length; i++) {
+    let code = codes.get(categories[i]);
+    if (code === undefined) {
+      code = codes.size;
+      codes.set(categories[i], code);
+    }
+    inverse[i] = code;
+  }
+  
+  const totals = new Int32Array(codes.size);
+  const correctCounts = new Int32Array(codes.size);
+  for (let i = 0; i < inverse.length; i++) {
+    totals[inverse[i]]++;
+    correctCounts[inverse[i]] += correct[i];
+  }
+  
+  const result: Record<string, { accuracy: number; correct: number; total: number }> = {};
+  for (const [category, code] of codes) {
+    const total = totals[code];
+    const correctCount = correctCounts[code];
+    result[category] = { accuracy: correctCount / total, correct: correctCount, total };
+  }
+  return result;
+}
+
+function percentile(sorted: ArrayLike<number>, p: number): number {
   if (sorted.length === 0) return 0;
   const index = Math.ceil((p / 100) * sorted.length) - 1;
   return sorted[Math.max(0, Math.min(index, sorted.length - 1))];
@@ -463,42 +707,47 @@ export function printEvaluationReport(
   metrics: Stage1Metrics | Stage2Metrics,
   modelName: string = 'Model'
 ): void {
-  console.log('\n' + '='.repeat(70));
-  console.log(`Stage ${stage} Evaluation Report: ${modelName}`);
-  console.log('='.repeat(70) + '\n');
+  // Collect the report and write it with a single console.log call
+  const lines: string[] = [];
+  
+  lines.push('\n' + '='.repeat(70));
+  lines.push(`Stage ${stage} Evaluation Report: ${modelName}`);
+  lines.push('='.repeat(70) + '\n');
   
   if (stage === 1) {
     const m = metrics as Stage1Metrics;
-    console.log('Classification Metrics:');
-    console.log(`  Accuracy:  ${m.accuracy.toFixed(3)}`);
-    console.log(`  Precision: ${m.precision.toFixed(3)}`);
-    console.log(`  Recall:    ${m.recall.toFixed(3)}`);
-    console.log(`  F1 Score:  ${m.f1Score.toFixed(3)}`);
-    console.log(`  FPR:       ${m.falsePositiveRate.toFixed(3)}`);
-    console.log(`  FNR:       ${m.falseNegativeRate.toFixed(3)}`);
+    lines.push('Classification Metrics:');
+    lines.push(`  Accuracy:  ${m.accuracy.toFixed(3)}`);
+    lines.push(`  Precision: ${m.precision.toFixed(3)}`);
+    lines.push(`  Recall:    ${m.recall.toFixed(3)}`);
+    lines.push(`  F1 Score:  ${m.f1Score.toFixed(3)}`);
+    lines.push(`  FPR:       ${m.falsePositiveRate.toFixed(3)}`);
+    lines.push(`  FNR:       ${m.falseNegativeRate.toFixed(3)}`);
   } else {
     const m = metrics as Stage2Metrics;
-    console.log('Accuracy Metrics:');
-    console.log(`  Overall Accuracy: ${m.accuracy.toFixed(3)}`);
-    console.log('\n  Per-Class Metrics:');
+    lines.push('Accuracy Metrics:');
+    lines.push(`  Overall Accuracy: ${m.accuracy.toFixed(3)}`);
+    lines.push('\n  Per-Class Metrics:');
     for (const [label, scores] of Object.entries(m.perClass)) {
-      console.log(
+      lines.push(
         `    ${label.toUpperCase()}: P=${scores.precision.toFixed(3)}, R=${scores.recall.toFixed(3)}, F1=${scores.f1Score.toFixed(3)}`
       );
     }
-    console.log('\n  Critical Errors:');
-    console.log(`    TRUE→FALSE: ${m.criticalErrors.trueMarkedFalse}`);
-    console.log(`    FALSE→TRUE: ${m.criticalErrors.falseMarkedTrue}`);
-    console.log(`    Critical Error Rate: ${m.criticalErrors.criticalErrorRate.toFixed(3)}`);
-    console.log('\n  Confidence Calibration:');
-    console.log(`    ECE: ${m.calibration.expectedCalibrationError.toFixed(3)}`);
+    lines.push('\n  Critical Errors:');
+    lines.push(`    TRUE→FALSE: ${m.criticalErrors.trueMarkedFalse}`);
+    lines.push(`    FALSE→TRUE: ${m.criticalErrors.falseMarkedTrue}`);
+    lines.push(`    Critical Error Rate: ${m.criticalErrors.criticalErrorRate.toFixed(3)}`);
+    lines.push('\n  Confidence Calibration:');
+    lines.push(`    ECE: ${m.calibration.expectedCalibrationError.toFixed(3)}`);
   }
   
-  console.log('\nPerformance Metrics:');
-  console.log(`  Mean Latency: ${metrics.meanLatency.toFixed(3)}s`);
-  console.log(`  P90 Latency:  ${metrics.p90Latency.toFixed(3)}s`);
-  console.log(`  Total Cost:   $${metrics.totalCost.toFixed(4)}`);
-  console.log(`  Cost/Sample:  $${metrics.meanCostPerSample.toFixed(6)}`);
+  lines.push('\nPerformance Metrics:');
+  lines.push(`  Mean Latency: ${metrics.meanLatency.toFixed(3)}s`);
+  lines.push(`  P90 Latency:  ${metrics.p90Latency.toFixed(3)}s`);
+  lines.push(`  Total Cost:   $${metrics.totalCost.toFixed(4)}`);
+  lines.push(`  Cost/Sample:  $${metrics.meanCostPerSample.toFixed(6)}`);
+  
+  lines.push('\n' + '='.repeat(70) + '\n');
   
-  console.log('\n' + '='.repeat(70) + '\n');
+  console.log(lines.join('\n'));
 }
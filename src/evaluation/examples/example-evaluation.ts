@@ -6,7 +6,7 @@
 import { DatasetManager, createExampleDatasets } from '../dataset/dataset-manager';
 import { ModelRunner, checkApiKeys } from '../models/model-runner';
 import { Stage1Evaluator, Stage2Evaluator, printEvaluationReport } from '../evaluation/evaluators';
-import { PromptRegistry } from '../prompts/prompt-registry';
+import { getPromptRegistry } from '../prompts/prompt-registry';
 import * as fs from 'fs';
 import * as path from 'path';
 
@@ -65,9 +65,9 @@ async function runStage1Example(manager: DatasetManager) {
     return;
   }
   
-  // Initialize
-  const runner = new ModelRunner();
-  const registry = new PromptRegistry();
+  // Initialize (--no-shortcut makes every sample go to the model)
+  const runner = new ModelRunner({ shortcuts: !process.argv.includes('--no-shortcut') });
+  const registry = getPromptRegistry();
   const evaluator = new Stage1Evaluator();
   
   // Get prompt
@@ -80,7 +80,7 @@ async function runStage1Example(manager: DatasetManager) {
   console.log(`Using prompt: ${prompt.name} (v${prompt.version})`);
   
   // Estimate cost
-  const costEst = runner.estimateCost('gpt-4o-mini', testData.length, 300, 100);
+  const costEst = runner.estimateSampleCost('gpt-4o-mini', prompt.systemPrompt, testData, 100);
   console.log(`\nEstimated cost: $${costEst.totalCost.toFixed(4)}`);
   
   // Run inference
@@ -131,7 +131,7 @@ async function runStage2Example(manager: DatasetManager) {
   
   // Initialize
   const runner = new ModelRunner();
-  const registry = new PromptRegistry();
+  const registry = getPromptRegistry();
   const evaluator = new Stage2Evaluator();
   
   // Get prompt
@@ -144,7 +144,7 @@ async function runStage2Example(manager: DatasetManager) {
   console.log(`Using prompt: ${prompt.name} (v${prompt.version})`);
   
   // Estimate cost
-  const costEst = runner.estimateCost('gpt-4o', testData.length, 2000, 200);
+  const costEst = runner.estimateSampleCost('gpt-4o', prompt.systemPrompt, testData, 200);
   console.log(`\nEstimated cost: $${costEst.totalCost.toFixed(4)}`);
   
   // Run inference
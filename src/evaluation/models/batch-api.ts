@@ -0,0 +1,239 @@
+/**
+ * Batch API clients - Submit many requests as one asynchronous job.
+ *
+ * OpenAI's Batch API and Anthropic's Message Batches API process requests
+ * within 24 hours at half the usual price and outside the normal rate
+ * limits, which suits offline evaluation where per-request latency does not
+ * matter. Both are driven over plain HTTP, since the AI SDK does not wrap
+ * them.
+ */
+
+export interface BatchRequest {
+  /** Unique per batch; letters, digits, '_' and '-' only (Anthropic) */
+  customId: string;
+  system: string;
+  user: string;
+  /** JSON Schema the response object must follow */
+  jsonSchema: Record<string, unknown>;
+  temperature: number;
+  maxTokens?: number;
+}
+
+export interface BatchResult {
+  /** Parsed response object, not yet validated */
+  output?: unknown;
+  usage?: { promptTokens: number; completionTokens: number; totalTokens: number };
+  error?: string;
+}
+
+export interface BatchOptions {
+  /** Milliseconds between status checks */
+  pollInterval?: number;
+  /** Called with the job status after every check */
+  onStatus?: (status: string) => void;
+}
+
+/** Max output tokens when none is configured (Anthropic requires one) */
+const DEFAULT_MAX_TOKENS = 1024;
+
+const OPENAI_API = 'https://api.openai.com/v1';
+const ANTHROPIC_API = 'https://api.anthropic.com/v1';
+const ANTHROPIC_VERSION = '2023-06-01';
+
+/** Name of the tool Anthropic is forced to call with the response object */
+const RESPONSE_TOOL = 'respond';
+
+/**
+ * Run requests through the OpenAI Batch API: upload them as a JSONL file,
+ * create a /v1/chat/completions batch, poll until it finishes and download
+ * the output and error files
+ */
+export async function runOpenAIBatch(
+  apiKey: string,
+  model: string,
+  requests: BatchRequest[],
+  options: BatchOptions = {}
+): Promise<Map<string, BatchResult>> {
+  const headers = { Authorization: `Bearer ${apiKey}` };
+
+  const lines = requests.map((r) =>
+    JSON.stringify({
+      custom_id: r.customId,
+      method: 'POST',
+      url: '/v1/chat/completions',
+      body: {
+        model,
+        messages: [
+          { role: 'system', content: r.system },
+          { role: 'user', content: r.user },
+        ],
+        temperature: r.temperature,
+        ...(r.maxTokens !== undefined && { max_completion_tokens: r.maxTokens }),
+        response_format: {
+          type: 'json_schema',
+          json_schema: { name: 'response', schema: r.jsonSchema },
+        },
+      },
+    })
+  );
+
+  const form = new FormData();
+  form.append('purpose', 'batch');
+  form.append('file', new Blob([lines.join('\n')], { type: 'application/jsonl' }), 'batch.jsonl');
+  const file = await fetchJson(`${OPENAI_API}/files`, { method: 'POST', headers, body: form });
+
+  let batch = await fetchJson(`${OPENAI_API}/batches`, {
+    method: 'POST',
+    headers: { ...headers, 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      input_file_id: file.id,
+      endpoint: '/v1/chat/completions',
+      completion_window: '24h',
+    }),
+  });
+
+  while (!['completed', 'failed', 'expired', 'cancelled'].includes(batch.status)) {
+    options.onStatus?.(batch.status);
+    await sleep(options.pollInterval ?? 30_000);
+    batch = await fetchJson(`${OPENAI_API}/batches/${batch.id}`, { headers });
+  }
+  options.onStatus?.(batch.status);
+
+  const results = new Map<string, BatchResult>();
+
+  // Expired batches still deliver the requests that finished in time
+  for (const fileId of [batch.output_file_id, batch.error_file_id]) {
+    if (!fileId) continue;
+
+    const content = await fetchText(`${OPENAI_API}/files/${fileId}/content`, { headers });
+    for (const line of jsonLines(content)) {
+      const body = line.response?.body;
+
+      if (line.error || line.response?.status_code !== 200) {
+        results.set(line.custom_id, {
+          error: line.error?.message ?? body?.error?.message ?? 'Batch request failed',
+        });
+        continue;
+      }
+
+      const usage = body.usage;
+      results.set(line.custom_id, {
+        ...parseOutput(body.choices?.[0]?.message?.content),
+        usage: {
+          promptTokens: usage.prompt_tokens,
+          completionTokens: usage.completion_tokens,
+          totalTokens: usage.total_tokens,
+        },
+      });
+    }
+  }
+
+  return results;
+}
+
+/**
+ * Run requests through the Anthropic Message Batches API. Structured output
+ * comes from forcing a call to a single tool whose input schema is the
+ * response schema.
+ */
+export async function runAnthropicBatch(
+  apiKey: string,
+  model: string,
+  requests: BatchRequest[],
+  options: BatchOptions = {}
+): Promise<Map<string, BatchResult>> {
+  const headers = { 'x-api-key': apiKey, 'anthropic-version': ANTHROPIC_VERSION };
+
+  let batch = await fetchJson(`${ANTHROPIC_API}/messages/batches`, {
+    method: 'POST',
+    headers: { ...headers, 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      requests: requests.map((r) => ({
+        custom_id: r.customId,
+        params: {
+          model,
+          max_tokens: r.maxTokens ?? DEFAULT_MAX_TOKENS,
+          temperature: r.temperature,
+          system: [{ type: 'text', text: r.system, cache_control: { type: 'ephemeral' } }],
+          messages: [{ role: 'user', content: r.user }],
+          tools: [{ name: RESPONSE_TOOL, input_schema: r.jsonSchema }],
+          tool_choice: { type: 'tool', name: RESPONSE_TOOL },
+        },
+      })),
+    }),
+  });
+
+  while (batch.processing_status !== 'ended') {
+    options.onStatus?.(batch.processing_status);
+    await sleep(options.pollInterval ?? 30_000);
+    batch = await fetchJson(`${ANTHROPIC_API}/messages/batches/${batch.id}`, { headers });
+  }
+  options.onStatus?.(batch.processing_status);
+
+  const results = new Map<string, BatchResult>();
+  const content = await fetchText(batch.results_url, { headers });
+
+  for (const line of jsonLines(content)) {
+    const result = line.result;
+
+    if (result?.type !== 'succeeded') {
+      results.set(line.custom_id, {
+        error: result?.error?.error?.message ?? `Batch request ${result?.type ?? 'failed'}`,
+      });
+      continue;
+    }
+
+    const message = result.message;
+    const toolUse = message.content?.find((block: any) => block.type === 'tool_use');
+    const usage = message.usage;
+    results.set(line.custom_id, {
+      ...(toolUse ? { output: toolUse.input } : { error: 'No tool call in response' }),
+      usage: {
+        promptTokens: usage.input_tokens,
+        completionTokens: usage.output_tokens,
+        totalTokens: usage.input_tokens + usage.output_tokens,
+      },
+    });
+  }
+
+  return results;
+}
+
+// ===== Helpers =====
+
+function parseOutput(content: string | null | undefined): BatchResult {
+  if (!content) {
+    return { error: 'Empty response' };
+  }
+  try {
+    return { output: JSON.parse(content) };
+  } catch {
+    return { error: 'Response is not valid JSON' };
+  }
+}
+
+function* jsonLines(content: string): Generator<any> {
+  for (const line of content.split('\n')) {
+    if (line.trim()) {
+      yield JSON.parse(line);
+    }
+  }
+}
+
+async function fetchJson(url: string, init: RequestInit): Promise<any> {
+  return JSON.parse(await fetchText(url, init));
+}
+
+async function fetchText(url: string, init: RequestInit): Promise<string> {
+  const response = await fetch(url, init);
+  const text = await response.text();
+
+  if (!response.ok) {
+    throw new Error(`Batch API request failed (${response.status}): ${text.slice(0, 200)}`);
+  }
+  return text;
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
@@ -4,10 +4,22 @@
  * Supports OpenAI, Anthropic, Google, and other providers through AI SDK.
  */
 
-import { generateObject } from 'ai';
+import * as fs from 'fs';
+import * as path from 'path';
+import { createHash } from 'crypto';
+import {
+  APICallError,
+  generateObject,
+  streamObject,
+  type LanguageModelUsage,
+  type ModelMessage,
+} from 'ai';
 import { createOpenAI } from '@ai-sdk/openai';
 import { createAnthropic } from '@ai-sdk/anthropic';
 import { z } from 'zod';
+import { RateLimiter } from './rate-limiter';
+import { TextShortcutCache } from './text-shortcut-cache';
+import { runAnthropicBatch, runOpenAIBatch, type BatchRequest } from './batch-api';
 import {
   Stage1Sample,
   Stage2Sample,
@@ -20,6 +32,37 @@ export interface ModelConfig {
   temperature?: number;
   maxTokens?: number;
   timeout?: number;
+  /**
+   * Ask only for the label and confidence under short field names, skipping
+   * claims, explanation, reasoning and sources. Output tokens dominate
+   * latency and cost, so this suits runs that only need accuracy metrics.
+   */
+  compact?: boolean;
+  /**
+   * Stage 2 only: stream the response and stop generating once verdict and
+   * confidence are complete. Predictions then carry no explanation or
+   * sources, and cost is estimated from text length (usage is unavailable
+   * for an aborted stream).
+   */
+  earlyExit?: boolean;
+  /**
+   * Provider limits in requests and tokens per minute. When set, calls to
+   * the model wait on a token bucket instead of relying on a low
+   * concurrency cap, so runBatch can use a higher maxConcurrency safely.
+   */
+  rpm?: number;
+  tpm?: number;
+  /**
+   * Attempts per request, including the first. Rate limits, server errors
+   * and dropped connections are retried with jittered exponential backoff;
+   * other errors (auth, bad request) fail immediately. Defaults to 3.
+   */
+  retryAttempts?: number;
+  /**
+   * Make runBatch submit all samples as one OpenAI Batch / Anthropic Message
+   * Batches job (see runBatchApi): half the cost, results within 24 hours.
+   */
+  useBatchApi?: boolean;
 }
 
 export interface ModelCosts {
@@ -70,18 +113,318 @@ const Stage2ResponseSchema = z.object({
   reasoning: z.string().optional(),
 });
 
+/** The fields an early-exited Stage 2 stream must have completed */
+const Stage2VerdictSchema = Stage2ResponseSchema.pick({ verdict: true, confidence: true });
+
+const Stage1GroupResponseSchema = z.object({
+  results: z.array(z.object({
+    id: z.string(),
+    hasClaim: z.boolean(),
+    confidence: z.number().min(0).max(1),
+  })),
+});
+
+const GROUP_INSTRUCTIONS = `
+
+The input is a JSON array of items, each with an "id" and a "text".
+Classify every item independently using the rules above and return one
+result per item, in the same order, echoing its "id".`;
+
+// Compact variants: short keys, no free text. Field descriptions reach the
+// model through the generated JSON schema.
+const Stage1CompactSchema = z.object({
+  h: z.boolean().describe('hasClaim: whether the text contains a checkable factual claim'),
+  c: z.number().min(0).max(1).describe('confidence'),
+});
+
+const Stage2CompactSchema = z.object({
+  v: z.enum(['true', 'false', 'unknown']).describe('verdict'),
+  c: z.number().min(0).max(1).describe('confidence'),
+});
+
+/** Output budget for compact responses, which are a few tokens long */
+const COMPACT_MAX_TOKENS = 64;
+
+/**
+ * Map a compact response back to the full response field names
+ */
+function expandCompact(object: any): any {
+  return 'h' in object
+    ? { hasClaim: object.h, confidence: object.c }
+    : { verdict: object.v, confidence: object.c };
+}
+
+// ===== Prompt Layout =====
+
+/**
+ * Build the request messages with the system prompt as a separate leading
+ * message. It is identical for every sample in a batch, so providers can
+ * serve it from their prompt cache: OpenAI matches long shared prefixes
+ * automatically, Anthropic needs the explicit cache breakpoint set here.
+ */
+function promptMessages(system: string | ModelMessage, userPrompt: string): ModelMessage[] {
+  return [
+    typeof system === 'string' ? systemMessage(system) : system,
+    { role: 'user', content: userPrompt },
+  ];
+}
+
+/** Messages prebuilt for one system prompt */
+interface PromptMessages {
+  system: ModelMessage;
+  /** System message for grouped Stage 1 requests, built on first use */
+  grouped?: ModelMessage;
+  /** Full message list per sample */
+  bySample: WeakMap<Stage1Sample | Stage2Sample, ModelMessage[]>;
+}
+
+/** The system message, marked as an Anthropic prompt-cache breakpoint */
+function systemMessage(system: string): ModelMessage {
+  return {
+    role: 'system',
+    content: system,
+    providerOptions: { anthropic: { cacheControl: { type: 'ephemeral' } } },
+  };
+}
+
+/** Price multiplier for requests sent through a provider's batch API */
+const BATCH_API_DISCOUNT = 0.5;
+
+/** JSON Schema for a response schema, as sent to the batch APIs */
+function responseJsonSchema(schema: z.ZodType): Record<string, unknown> {
+  const jsonSchema: Record<string, unknown> = { ...z.toJSONSchema(schema, { io: 'input' }) };
+  delete jsonSchema.$schema;
+  return jsonSchema;
+}
+
+type ProviderRoute = 'openai' | 'anthropic' | null;
+
+// Model name -> provider, resolved once per distinct model name
+const providerRoutes = new Map<string, ProviderRoute>();
+
+/**
+ * Provider serving a model, or null if unknown. Called on every request,
+ * so the substring matching is memoized.
+ */
+function routeModel(model: string): ProviderRoute {
+  let route = providerRoutes.get(model);
+  
+  if (route === undefined) {
+    const modelLower = model.toLowerCase();
+    if (modelLower.includes('gpt') || modelLower.includes('o1')) {
+      route = 'openai';
+    } else if (modelLower.includes('claude')) {
+      route = 'anthropic';
+    } else {
+      route = null;
+    }
+    providerRoutes.set(model, route);
+  }
+  
+  return route;
+}
+
+/** The user message sent for a sample */
+function userPromptFor(sample: Stage1Sample | Stage2Sample): string {
+  return 'hasClaim' in sample ? sample.text : `Verify this claim: ${sample.claim}`;
+}
+
+// ===== Response Cache =====
+
+/** Generation settings that, with the prompts, determine a response */
+interface RequestSettings {
+  temperature: number;
+  maxTokens?: number;
+  compact: boolean;
+  earlyExit: boolean;
+}
+
+/**
+ * Settings for a request, with the per-stage defaults applied
+ */
+function requestSettings(stage: 1 | 2, config: ModelConfig): RequestSettings {
+  const compact = config.compact ?? false;
+  return {
+    temperature: config.temperature ?? (stage === 1 ? 0.3 : 0.5),
+    maxTokens: config.maxTokens ?? (compact ? COMPACT_MAX_TOKENS : undefined),
+    compact,
+    // Compact responses end right after the confidence anyway
+    earlyExit: stage === 2 && !compact && (config.earlyExit ?? false),
+  };
+}
+
+/** One sample's even share of a grouped request's token usage */
+function usageShare(usage: TokenUsage, count: number): TokenUsage {
+  return {
+    promptTokens: usage.promptTokens / count,
+    completionTokens: usage.completionTokens / count,
+    totalTokens: usage.totalTokens / count,
+  };
+}
+
+/** Token counts for one request, as used for cost */
+interface TokenUsage {
+  promptTokens: number;
+  completionTokens: number;
+  totalTokens: number;
+}
+
+/**
+ * Normalize the AI SDK's usage, whose counts a provider may leave undefined
+ */
+function tokenUsage(usage: LanguageModelUsage): TokenUsage {
+  const promptTokens = usage.inputTokens ?? 0;
+  const completionTokens = usage.outputTokens ?? 0;
+  return {
+    promptTokens,
+    completionTokens,
+    totalTokens: usage.totalTokens ?? promptTokens + completionTokens,
+  };
+}
+
+interface CachedResponse {
+  result: any;
+  usage: TokenUsage;
+  /** Set when the response stream was stopped after the verdict */
+  earlyExit?: boolean;
+}
+
+// System prompt -> digest. Prompts are immutable and shared by every sample
+// in a run, so each is hashed once instead of once per request.
+const promptDigests = new Map<string, string>();
+
+function promptDigest(system: string): string {
+  let digest = promptDigests.get(system);
+  if (digest === undefined) {
+    digest = createHash('blake2b512').update(system).digest('base64');
+    promptDigests.set(system, digest);
+  }
+  return digest;
+}
+
+/**
+ * Exact-match key for one request, shared by single-flight and the response
+ * cache. Hashing keeps keys short and file-name safe however long the prompt
+ * and input are.
+ */
+function requestKey(
+  model: string,
+  stage: 1 | 2,
+  settings: RequestSettings,
+  system: string,
+  userPrompt: string
+): string {
+  const { temperature, maxTokens, compact, earlyExit } = settings;
+  return createHash('blake2b512')
+    .update(
+      JSON.stringify([
+        model,
+        stage,
+        temperature,
+        maxTokens ?? null,
+        compact,
+        earlyExit,
+        promptDigest(system),
+        userPrompt,
+      ])
+    )
+    .digest('hex');
+}
+
+// ===== Retries =====
+
+const RETRY_MIN_DELAY_MS = 1000;
+const RETRY_MAX_DELAY_MS = 30_000;
+
+/**
+ * Run a call, retrying transient API errors after a random delay of up to
+ * 2^attempt seconds (capped at 30s, at least 1s). Jitter keeps concurrent
+ * workers that hit the same 429 from retrying in lockstep.
+ */
+async function withRetry<T>(attempts: number, call: () => Promise<T>): Promise<T> {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await call();
+    } catch (error) {
+      if (attempt >= attempts || !(APICallError.isInstance(error) && error.isRetryable)) {
+        throw error;
+      }
+      
+      const ceiling = Math.min(RETRY_MAX_DELAY_MS, RETRY_MIN_DELAY_MS * 2 ** attempt);
+      const delay = Math.max(RETRY_MIN_DELAY_MS, Math.random() * ceiling);
+      await new Promise((resolve) => setTimeout(resolve, delay));
+    }
+  }
+}
+
+/** Output tokens assumed per request when reserving rate-limit budget */
+const ESTIMATED_OUTPUT_TOKENS = 300;
+
+/**
+ * Rough token count (~4 characters per token), for budgeting and for text
+ * whose usage the API did not report
+ */
+function approximateTokens(text: string): number {
+  return Math.ceil(text.length / 4);
+}
+
+/** Rough input token count of a message list */
+function messageTokens(messages: ModelMessage[]): number {
+  let tokens = 0;
+  for (const message of messages) {
+    if (typeof message.content === 'string') {
+      tokens += approximateTokens(message.content);
+    }
+  }
+  return tokens;
+}
+
 // ===== Model Runner =====
 
 export class ModelRunner {
   private openaiKey: string | null = null;
   private anthropicKey: string | null = null;
+  // Provider instances are created once and shared by every request
+  private openaiProvider: any = null;
+  private anthropicProvider: any = null;
+  private responseCache: Map<string, CachedResponse> | null = null;
+  private inflight = new Map<string, Promise<CachedResponse>>();
+  private rateLimiters = new Map<string, RateLimiter>();
+  private messageCache = new Map<string, PromptMessages>();
+  private cacheDir: string | null = null;
+  private shortcuts: TextShortcutCache | null = null;
   
+  /**
+   * @param options.cache - Reuse responses for identical requests (model, stage,
+   *   temperature, max tokens, system prompt and input) within this runner
+   * @param options.cacheDir - Also persist cached responses to this directory
+   *   so repeated runs skip the API entirely; implies `cache`
+   * @param options.shortcuts - Answer Stage 1 samples whose normalized text
+   *   was already classified with confidence >= 0.95, by any model or prompt,
+   *   without calling the API. Pass a TextShortcutCache to share it between
+   *   runners. Leave off for model or prompt comparisons.
+   */
   constructor(options: {
     openaiKey?: string;
     anthropicKey?: string;
+    cache?: boolean;
+    cacheDir?: string;
+    shortcuts?: boolean | TextShortcutCache;
   } = {}) {
     this.openaiKey = options.openaiKey || process.env.OPENAI_API_KEY || null;
     this.anthropicKey = options.anthropicKey || process.env.ANTHROPIC_API_KEY || null;
+    
+    if (options.cache || options.cacheDir) {
+      this.responseCache = new Map();
+    }
+    if (options.cacheDir) {
+      fs.mkdirSync(options.cacheDir, { recursive: true });
+      this.cacheDir = options.cacheDir;
+    }
+    if (options.shortcuts) {
+      this.shortcuts =
+        options.shortcuts instanceof TextShortcutCache ? options.shortcuts : new TextShortcutCache();
+    }
   }
   
   /**
@@ -100,143 +443,806 @@ export class ModelRunner {
       // Determine stage from sample type
       const isStage1 = 'hasClaim' in sample;
       
-      // Get model provider
-      const provider = this.getProvider(model);
+      const shortcut = isStage1 ? this.shortcuts?.get((sample as Stage1Sample).text) : undefined;
+      if (shortcut) {
+        return {
+          sampleId,
+          prediction: shortcut.hasClaim,
+          confidence: shortcut.confidence,
+          sources: [],
+          latency: (Date.now() - startTime) / 1000,
+          cost: 0,
+          metadata: {
+            model,
+            tokensUsed: 0,
+            success: true,
+            shortcut: true,
+          },
+        };
+      }
+      
+      const stage = isStage1 ? 1 : 2;
+      const settings = requestSettings(stage, config);
+      const key = requestKey(model, stage, settings, prompt, userPromptFor(sample));
       
-      // Prepare input text
-      const inputText = isStage1 ? (sample as Stage1Sample).text : (sample as Stage2Sample).claim;
+      // Replayed responses come from the cache or from an identical request
+      // already in flight
+      let response = this.readCache(key);
+      const replayed = response !== undefined || this.inflight.has(key);
       
-      // Run inference based on stage
-      let result: any;
-      let usage: any;
+      if (!response) {
+        response = await this.requestOnce(key, () =>
+          this.requestSingle(model, stage, prompt, sample, settings, config)
+        );
+      }
       
       if (isStage1) {
-        // Stage 1: Claim Detection
-        const response = await generateObject({
-          model: provider(model),
-          schema: Stage1ResponseSchema,
-          system: prompt,
-          prompt: inputText,
-          temperature: config.temperature ?? 0.3,
-        });
+        this.shortcuts?.record(
+          (sample as Stage1Sample).text,
+          response.result.hasClaim,
+          response.result.confidence
+        );
+      }
+      
+      return this.responsePrediction(model, sample, response, startTime, replayed);
+    } catch (error) {
+      return this.errorPrediction(model, sampleId, startTime, error);
+    }
+  }
+  
+  /**
+   * Format a response as a prediction. Replayed responses cost nothing.
+   */
+  private responsePrediction(
+    model: string,
+    sample: Stage1Sample | Stage2Sample,
+    response: CachedResponse,
+    startTime: number,
+    replayed: boolean
+  ): ModelPrediction {
+    const { result, usage } = response;
+    const stoppedEarly = response.earlyExit ?? false;
+    
+    const latency = (Date.now() - startTime) / 1000;
+    const cost = replayed
+      ? 0
+      : this.calculateCost(model, usage.promptTokens, usage.completionTokens);
+    
+    return {
+      sampleId: sample.id,
+      prediction: 'hasClaim' in sample ? result.hasClaim : result.verdict,
+      confidence: result.confidence,
+      explanation: result.explanation || result.reasoning,
+      sources: result.sources || [],
+      latency,
+      cost,
+      metadata: {
+        model,
+        tokensUsed: usage.totalTokens,
+        success: true,
+        ...(stoppedEarly && { earlyExit: true }),
+        ...(replayed && { cached: true }),
+      },
+    };
+  }
+  
+  /**
+   * Format a failed request as a prediction
+   */
+  private errorPrediction(
+    model: string,
+    sampleId: string,
+    startTime: number,
+    error: unknown
+  ): ModelPrediction {
+    return {
+      sampleId,
+      prediction: null,
+      confidence: 0,
+      sources: [],
+      latency: (Date.now() - startTime) / 1000,
+      cost: 0,
+      metadata: {
+        model,
+        error: error instanceof Error ? error.message : 'Unknown error',
+        success: false,
+      },
+    };
+  }
+  
+  /**
+   * Get the messages for a sample under a system prompt, built once and
+   * reused when the same samples are run again (other models, retries,
+   * cascades). All samples share one system message object per prompt.
+   * Messages are never mutated, so sharing them is safe.
+   */
+  private messagesFor(prompt: string, sample: Stage1Sample | Stage2Sample): ModelMessage[] {
+    const entry = this.promptEntry(prompt);
+    
+    let messages = entry.bySample.get(sample);
+    if (!messages) {
+      messages = promptMessages(entry.system, userPromptFor(sample));
+      entry.bySample.set(sample, messages);
+    }
+    return messages;
+  }
+  
+  /**
+   * Get the system message for grouped Stage 1 requests: the prompt plus the
+   * grouping instructions, concatenated once per prompt rather than per group
+   */
+  private groupSystemMessage(prompt: string): ModelMessage {
+    const entry = this.promptEntry(prompt);
+    return (entry.grouped ??= systemMessage(prompt + GROUP_INSTRUCTIONS));
+  }
+  
+  /**
+   * Get the message cache entry for a system prompt, creating it on first use
+   */
+  private promptEntry(prompt: string): PromptMessages {
+    let entry = this.messageCache.get(prompt);
+    if (!entry) {
+      entry = { system: systemMessage(prompt), bySample: new WeakMap() };
+      this.messageCache.set(prompt, entry);
+    }
+    return entry;
+  }
+  
+  /**
+   * Send one sample as a request of its own, retrying transient errors
+   */
+  private requestSingle(
+    model: string,
+    stage: 1 | 2,
+    prompt: string,
+    sample: Stage1Sample | Stage2Sample,
+    settings: RequestSettings,
+    config: ModelConfig
+  ): Promise<CachedResponse> {
+    const limiter = this.getRateLimiter(model, config);
+    const messages = this.messagesFor(prompt, sample);
+    return withRetry(config.retryAttempts ?? 3, () =>
+      this.request(model, stage, messages, settings, limiter)
+    );
+  }
+  
+  /**
+   * Call the model with prebuilt messages, dispatching on stage and settings
+   */
+  private async request(
+    model: string,
+    stage: 1 | 2,
+    messages: ModelMessage[],
+    settings: RequestSettings,
+    limiter: RateLimiter | null
+  ): Promise<CachedResponse> {
+    const { temperature, maxTokens: maxOutputTokens, compact, earlyExit } = settings;
+    
+    await limiter?.acquire(messageTokens(messages) + (maxOutputTokens ?? ESTIMATED_OUTPUT_TOKENS));
+    
+    if (stage === 1) {
+      // Stage 1: Claim Detection
+      const provider = this.getProvider(model);
+      const response = await generateObject({
+        model: provider(model),
+        schema: compact ? Stage1CompactSchema : Stage1ResponseSchema,
+        messages,
+        temperature,
+        maxOutputTokens,
+        maxRetries: 0,
+      });
+      limiter?.update(response.response?.headers);
+      
+      return {
+        result: compact ? expandCompact(response.object) : response.object,
+        usage: tokenUsage(response.usage),
+      };
+    } else if (earlyExit) {
+      // Stage 2: Verification, streamed and cut short after the verdict
+      return this.streamVerdict(model, messages, temperature, maxOutputTokens);
+    } else {
+      // Stage 2: Verification
+      const provider = this.getProvider(model);
+      const response = await generateObject({
+        model: provider(model),
+        schema: compact ? Stage2CompactSchema : Stage2ResponseSchema,
+        messages,
+        temperature,
+        maxOutputTokens,
+        maxRetries: 0,
+      });
+      limiter?.update(response.response?.headers);
+      
+      return {
+        result: compact ? expandCompact(response.object) : response.object,
+        usage: tokenUsage(response.usage),
+      };
+    }
+  }
+  
+  /**
+   * Single-flight: concurrent identical requests share one API call, and its
+   * response is cached once it settles if caching is on. Duplicates within a
+   * batch would otherwise each make their own call, even with the cache,
+   * since they all miss it before the first response is written.
+   */
+  private requestOnce(key: string, run: () => Promise<CachedResponse>): Promise<CachedResponse> {
+    let pending = this.inflight.get(key);
+    
+    if (!pending) {
+      pending = run()
+        .then((response) => {
+          this.writeCache(key, response);
+          return response;
+        })
+        .finally(() => this.inflight.delete(key));
+      this.inflight.set(key, pending);
+    }
+    
+    return pending;
+  }
+  
+  /**
+   * Run batch inference with parallel execution.
+   * 
+   * Keeps up to maxConcurrency requests in flight: each worker picks up the
+   * next sample as soon as its previous request settles, so one slow call
+   * never stalls the rest. Predictions are returned in sample order.
+   * 
+   * With groupSize > 1, Stage 1 samples are classified groupSize at a time
+   * in a single request (see runGrouped); Stage 2 always runs per sample.
+   * 
+   * onPrediction receives each prediction (with its sample index) as soon as
+   * it completes, e.g. to append it to a results file or to fill evaluation
+   * columns with setPredictionRow as results arrive. For very large runs,
+   * pass collect: false as well so predictions are not retained; runBatch
+   * then resolves to an empty array.
+   */
+  async runBatch(
+    model: string,
+    prompt: string,
+    samples: (Stage1Sample | Stage2Sample)[],
+    options: {
+      maxConcurrency?: number;
+      showProgress?: boolean;
+      config?: ModelConfig;
+      groupSize?: number;
+      onPrediction?: (prediction: ModelPrediction, index: number) => void;
+      collect?: boolean;
+    } = {}
+  ): Promise<ModelPrediction[]> {
+    const {
+      maxConcurrency = 5,
+      showProgress = true,
+      config = {},
+      groupSize = 1,
+      onPrediction,
+      collect = true,
+    } = options;
+    
+    if (config.useBatchApi) {
+      const batchPredictions = await this.runBatchApi(model, prompt, samples, {
+        config,
+        showProgress,
+      });
+      if (onPrediction) {
+        batchPredictions.forEach(onPrediction);
+      }
+      return collect ? batchPredictions : [];
+    }
+    
+    if (showProgress) {
+      console.log(`Processing ${samples.length} samples with ${model}...`);
+    }
+    
+    const grouped = groupSize > 1 && samples.every((s) => 'hasClaim' in s);
+    const step = grouped ? groupSize : 1;
+    const reportEvery = maxConcurrency * step;
+    
+    const predictions: ModelPrediction[] = collect ? new Array(samples.length) : [];
+    const emit = (prediction: ModelPrediction, index: number): void => {
+      if (collect) {
+        predictions[index] = prediction;
+      }
+      onPrediction?.(prediction, index);
+    };
+    
+    let next = 0;
+    let completed = 0;
+    
+    const worker = async (): Promise<void> => {
+      while (next < samples.length) {
+        const start = next;
+        const end = Math.min(start + step, samples.length);
+        next = end;
         
-        result = response.object;
-        usage = response.usage;
-      } else {
-        // Stage 2: Verification
-        const response = await generateObject({
-          model: provider(model),
-          schema: Stage2ResponseSchema,
-          system: prompt,
-          prompt: `Verify this claim: ${inputText}`,
-          temperature: config.temperature ?? 0.5,
-        });
+        if (grouped) {
+          const group = samples.slice(start, end) as Stage1Sample[];
+          const results = await this.runGrouped(model, prompt, group, config);
+          for (let j = 0; j < results.length; j++) {
+            emit(results[j], start + j);
+          }
+        } else {
+          emit(await this.runSingle(model, prompt, samples[start], config), start);
+        }
         
-        result = response.object;
-        usage = response.usage;
+        completed += end - start;
+        if (showProgress && (completed % reportEvery === 0 || completed === samples.length)) {
+          console.log(`Progress: ${completed}/${samples.length}`);
+        }
+      }
+    };
+    
+    const workers: Promise<void>[] = [];
+    for (let i = 0; i < Math.min(maxConcurrency, samples.length); i++) {
+      workers.push(worker());
+    }
+    await Promise.all(workers);
+    
+    return predictions;
+  }
+  
+  /**
+   * Run samples through the provider's batch API as one asynchronous job
+   * (OpenAI Batch API or Anthropic Message Batches), polling until it ends.
+   * 
+   * Batch requests cost half as much and do not count against the normal
+   * rate limits, but can take up to 24 hours, so this suits offline
+   * evaluation only. Latency is the wall-clock time until the batch
+   * finished. The response cache, rate limiter, early exit and retries do
+   * not apply; samples the job failed come back as error predictions.
+   */
+  async runBatchApi(
+    model: string,
+    prompt: string,
+    samples: (Stage1Sample | Stage2Sample)[],
+    options: {
+      config?: ModelConfig;
+      pollInterval?: number;
+      showProgress?: boolean;
+    } = {}
+  ): Promise<ModelPrediction[]> {
+    const { config = {}, pollInterval, showProgress = true } = options;
+    const startTime = Date.now();
+    const compact = config.compact ?? false;
+    
+    // Validates the model family and its API key
+    this.getProvider(model);
+    const isAnthropic = routeModel(model) === 'anthropic';
+    
+    const schemas: z.ZodType[] = samples.map((sample) => {
+      if ('hasClaim' in sample) {
+        return compact ? Stage1CompactSchema : Stage1ResponseSchema;
+      }
+      return compact ? Stage2CompactSchema : Stage2ResponseSchema;
+    });
+    const jsonSchemas = new Map<z.ZodType, Record<string, unknown>>();
+    
+    const requests: BatchRequest[] = samples.map((sample, i) => {
+      const schema = schemas[i];
+      if (!jsonSchemas.has(schema)) {
+        jsonSchemas.set(schema, responseJsonSchema(schema));
       }
       
-      const latency = (Date.now() - startTime) / 1000;
-      const cost = this.calculateCost(model, usage.promptTokens, usage.completionTokens);
+      return {
+        customId: `s${i}`,
+        system: prompt,
+        user: userPromptFor(sample),
+        jsonSchema: jsonSchemas.get(schema)!,
+        temperature: config.temperature ?? ('hasClaim' in sample ? 0.3 : 0.5),
+        maxTokens: config.maxTokens ?? (compact ? COMPACT_MAX_TOKENS : undefined),
+      };
+    });
+    
+    if (showProgress) {
+      console.log(`Submitting ${samples.length} samples to the ${model} batch API...`);
+    }
+    
+    let lastStatus = '';
+    const batchOptions = {
+      pollInterval,
+      onStatus: (status: string) => {
+        if (showProgress && status !== lastStatus) {
+          console.log(`Batch status: ${status}`);
+        }
+        lastStatus = status;
+      },
+    };
+    const results = isAnthropic
+      ? await runAnthropicBatch(this.anthropicKey!, model, requests, batchOptions)
+      : await runOpenAIBatch(this.openaiKey!, model, requests, batchOptions);
+    
+    const latency = (Date.now() - startTime) / 1000;
+    
+    return samples.map((sample, i) => {
+      const batchResult = results.get(`s${i}`);
+      const parsed =
+        batchResult?.output !== undefined ? schemas[i].safeParse(batchResult.output) : undefined;
       
-      // Format prediction
-      const prediction: ModelPrediction = {
-        sampleId,
-        prediction: isStage1 ? result.hasClaim : result.verdict,
+      if (!parsed?.success || !batchResult?.usage) {
+        return {
+          sampleId: sample.id,
+          prediction: null,
+          confidence: 0,
+          sources: [],
+          latency,
+          cost: 0,
+          metadata: {
+            model,
+            error:
+              batchResult?.error ??
+              (parsed ? 'Response does not match schema' : 'Missing from batch results'),
+            success: false,
+          },
+        };
+      }
+      
+      const result: any = compact ? expandCompact(parsed.data) : parsed.data;
+      const { usage } = batchResult;
+      
+      return {
+        sampleId: sample.id,
+        prediction: 'hasClaim' in sample ? result.hasClaim : result.verdict,
         confidence: result.confidence,
         explanation: result.explanation || result.reasoning,
         sources: result.sources || [],
         latency,
-        cost,
+        cost:
+          this.calculateCost(model, usage.promptTokens, usage.completionTokens) *
+          BATCH_API_DISCOUNT,
         metadata: {
           model,
           tokensUsed: usage.totalTokens,
           success: true,
+          batchApi: true,
         },
       };
-      
-      return prediction;
-    } catch (error) {
-      const latency = (Date.now() - startTime) / 1000;
-      
-      return {
-        sampleId,
-        prediction: null,
-        confidence: 0,
-        sources: [],
-        latency,
-        cost: 0,
-        metadata: {
-          model,
-          error: error instanceof Error ? error.message : 'Unknown error',
-          success: false,
-        },
-      };
-    }
+    });
   }
   
   /**
-   * Run batch inference with parallel execution
+   * Run a cheap model first and escalate only uncertain samples.
+   * 
+   * Every sample goes to models[0]; samples whose prediction failed or came
+   * back below the confidence threshold are re-run on models[1]. Escalated
+   * predictions keep the stronger model's answer, carry the combined cost
+   * and latency of both calls, and record the first model in
+   * metadata.escalatedFrom.
    */
-  async runBatch(
-    model: string,
+  async runCascade(
+    models: [string, string],
     prompt: string,
     samples: (Stage1Sample | Stage2Sample)[],
     options: {
+      threshold?: number;
       maxConcurrency?: number;
       showProgress?: boolean;
       config?: ModelConfig;
     } = {}
   ): Promise<ModelPrediction[]> {
-    const { maxConcurrency = 5, showProgress = true, config = {} } = options;
+    const { threshold = 0.8, showProgress = true } = options;
+    const [cheapModel, strongModel] = models;
+    
+    const predictions = await this.runBatch(cheapModel, prompt, samples, options);
+    
+    const escalate: number[] = [];
+    predictions.forEach((p, i) => {
+      if (p.prediction === null || p.confidence < threshold) {
+        escalate.push(i);
+      }
+    });
     
     if (showProgress) {
-      console.log(`Processing ${samples.length} samples with ${model}...`);
+      const fraction = samples.length > 0 ? escalate.length / samples.length : 0;
+      console.log(
+        `Escalating ${escalate.length}/${samples.length} (${(fraction * 100).toFixed(1)}%) to ${strongModel}`
+      );
+    }
+    
+    if (escalate.length === 0) {
+      return predictions;
+    }
+    
+    const escalated = await this.runBatch(
+      strongModel,
+      prompt,
+      escalate.map((i) => samples[i]),
+      options
+    );
+    
+    escalate.forEach((index, j) => {
+      const first = predictions[index];
+      const second = escalated[j];
+      predictions[index] = {
+        ...second,
+        latency: first.latency + second.latency,
+        cost: first.cost + second.cost,
+        metadata: { ...second.metadata, escalatedFrom: cheapModel },
+      };
+    });
+    
+    return predictions;
+  }
+  
+  /**
+   * Classify several Stage 1 samples in one request.
+   * 
+   * The samples are sent as a JSON array and the model returns one result per
+   * id, amortizing request overhead and system-prompt prefill across the
+   * group. Latency is the shared request time; cost and tokens are split
+   * evenly. Samples missing from the response, or the whole group if the
+   * request fails, fall back to a request of their own.
+   * 
+   * Samples that a shortcut, a cached response or an identical request in
+   * flight can answer are replayed as in runSingle instead of being sent.
+   * Each grouped result is cached and recorded as a shortcut as if it came
+   * from its own request, and counts as in flight until the group returns.
+   */
+  async runGrouped(
+    model: string,
+    prompt: string,
+    samples: Stage1Sample[],
+    config: ModelConfig = {}
+  ): Promise<ModelPrediction[]> {
+    const startTime = Date.now();
+    const settings = requestSettings(1, config);
+    const keys = samples.map((s) => requestKey(model, 1, settings, prompt, userPromptFor(s)));
+    
+    // Request key -> the one sample sent for it
+    const sent = new Map<string, Stage1Sample>();
+    samples.forEach((sample, i) => {
+      const key = keys[i];
+      if (
+        !sent.has(key) &&
+        !this.shortcuts?.get(sample.text) &&
+        !this.readCache(key) &&
+        !this.inflight.has(key)
+      ) {
+        sent.set(key, sample);
+      }
+    });
+    
+    if (sent.size === 0) {
+      return Promise.all(samples.map((s) => this.runSingle(model, prompt, s, config)));
     }
     
-    const predictions: ModelPrediction[] = [];
-    const batches: (Stage1Sample | Stage2Sample)[][] = [];
+    const group = [...sent.values()];
+    const reply = this.requestGroup(model, prompt, group, config).catch(() => null);
     
-    // Split into batches
-    for (let i = 0; i < samples.length; i += maxConcurrency) {
-      batches.push(samples.slice(i, i + maxConcurrency));
+    // Registered as in flight before anything is awaited, so duplicates of
+    // these samples wait for the group rather than sending their own request
+    const answered = new Set<string>();
+    const responses = new Map<string, Promise<CachedResponse>>();
+    for (const [key, sample] of sent) {
+      const response = this.requestOnce(key, async () => {
+        const groupReply = await reply;
+        const result = groupReply?.results.get(sample.id);
+        if (!groupReply || !result) {
+          return this.requestSingle(model, 1, prompt, sample, settings, config);
+        }
+        
+        answered.add(key);
+        return {
+          result: { hasClaim: result.hasClaim, confidence: result.confidence },
+          usage: usageShare(groupReply.usage, group.length),
+        };
+      });
+      responses.set(key, response);
     }
     
-    // Process batches
-    let completed = 0;
-    for (const batch of batches) {
-      const batchPromises = batch.map((sample) =>
-        this.runSingle(model, prompt, sample, config)
-      );
-      
-      const batchResults = await Promise.all(batchPromises);
-      predictions.push(...batchResults);
+    return Promise.all(
+      samples.map(async (sample, i) => {
+        const key = keys[i];
+        if (sent.get(key) !== sample) {
+          return this.runSingle(model, prompt, sample, config);
+        }
+        
+        let response: CachedResponse;
+        try {
+          response = await responses.get(key)!;
+        } catch (error) {
+          return this.errorPrediction(model, sample.id, startTime, error);
+        }
+        
+        const { result, usage } = response;
+        this.shortcuts?.record(sample.text, result.hasClaim, result.confidence);
+        
+        if (!answered.has(key)) {
+          return this.responsePrediction(model, sample, response, startTime, false);
+        }
+        
+        return {
+          sampleId: sample.id,
+          prediction: result.hasClaim,
+          confidence: result.confidence,
+          sources: [],
+          latency: (Date.now() - startTime) / 1000,
+          cost: this.calculateCost(model, usage.promptTokens, usage.completionTokens),
+          metadata: {
+            model,
+            tokensUsed: usage.totalTokens,
+            success: true,
+            groupSize: group.length,
+          },
+        };
+      })
+    );
+  }
+  
+  /**
+   * Send Stage 1 samples as one grouped request, retrying transient errors,
+   * and index the results by sample id
+   */
+  private async requestGroup(
+    model: string,
+    prompt: string,
+    samples: Stage1Sample[],
+    config: ModelConfig
+  ): Promise<{
+    results: Map<string, z.infer<typeof Stage1GroupResponseSchema>['results'][number]>;
+    usage: TokenUsage;
+  }> {
+    const provider = this.getProvider(model);
+    const messages = promptMessages(
+      this.groupSystemMessage(prompt),
+      JSON.stringify(samples.map((s) => ({ id: s.id, text: s.text })))
+    );
+    const limiter = this.getRateLimiter(model, config);
+    
+    const response = await withRetry(config.retryAttempts ?? 3, async () => {
+      // Each grouped result is a short {id, hasClaim, confidence} object
+      await limiter?.acquire(messageTokens(messages) + 50 * samples.length);
       
-      completed += batch.length;
-      if (showProgress) {
-        console.log(`Progress: ${completed}/${samples.length}`);
+      const reply = await generateObject({
+        model: provider(model),
+        schema: Stage1GroupResponseSchema,
+        messages,
+        temperature: config.temperature ?? 0.3,
+        maxRetries: 0,
+      });
+      limiter?.update(reply.response?.headers);
+      return reply;
+    });
+    
+    return {
+      results: new Map(response.object.results.map((r) => [r.id, r])),
+      usage: tokenUsage(response.usage),
+    };
+  }
+  
+  /**
+   * Stream a Stage 2 response and abort it as soon as verdict and confidence
+   * are final, saving the decode time of the explanation and sources.
+   * 
+   * Fields arrive in schema order, so confidence is complete once the next
+   * field has started. Streams that finish without reaching that point, or
+   * whose verdict and confidence fail validation there, resolve normally with
+   * the full validated object and reported usage.
+   */
+  private async streamVerdict(
+    model: string,
+    messages: ModelMessage[],
+    temperature: number,
+    maxOutputTokens: number | undefined
+  ): Promise<CachedResponse> {
+    const provider = this.getProvider(model);
+    const controller = new AbortController();
+    const stream = streamObject({
+      model: provider(model),
+      schema: Stage2ResponseSchema,
+      messages,
+      temperature,
+      maxOutputTokens,
+      maxRetries: 0,
+      abortSignal: controller.signal,
+    });
+    
+    let checkVerdict = true;
+    for await (const partial of stream.partialObjectStream) {
+      // A partial verdict string ('tru') can only appear before confidence
+      if (
+        checkVerdict &&
+        partial.verdict !== undefined &&
+        typeof partial.confidence === 'number' &&
+        partial.explanation !== undefined
+      ) {
+        const verdict = Stage2VerdictSchema.safeParse(partial);
+        if (!verdict.success) {
+          // Read on so the full object is validated as in the non-streamed path
+          checkVerdict = false;
+          continue;
+        }
+        
+        controller.abort();
+        
+        const result = { ...verdict.data, sources: [] };
+        const promptTokens = messageTokens(messages);
+        const completionTokens = approximateTokens(JSON.stringify(partial));
+        return {
+          result,
+          usage: { promptTokens, completionTokens, totalTokens: promptTokens + completionTokens },
+          earlyExit: true,
+        };
       }
     }
     
-    return predictions;
+    return { result: await stream.object, usage: tokenUsage(await stream.usage) };
+  }
+  
+  /**
+   * Look up a cached response, falling back to the cache directory
+   */
+  private readCache(key: string): CachedResponse | undefined {
+    if (!this.responseCache) {
+      return undefined;
+    }
+    
+    let entry = this.responseCache.get(key);
+    
+    if (!entry && this.cacheDir) {
+      const filepath = path.join(this.cacheDir, `${key}.json`);
+      if (fs.existsSync(filepath)) {
+        try {
+          entry = JSON.parse(fs.readFileSync(filepath, 'utf-8')) as CachedResponse;
+          this.responseCache.set(key, entry);
+        } catch {
+          // Unreadable entry: treat as a miss and overwrite it after the call
+          entry = undefined;
+        }
+      }
+    }
+    
+    return entry;
   }
   
   /**
-   * Get provider for model
+   * Store a response in memory and, if configured, on disk
+   */
+  private writeCache(key: string, entry: CachedResponse): void {
+    if (!this.responseCache) {
+      return;
+    }
+    
+    this.responseCache.set(key, entry);
+    
+    if (this.cacheDir) {
+      fs.writeFileSync(path.join(this.cacheDir, `${key}.json`), JSON.stringify(entry));
+    }
+  }
+  
+  /**
+   * Get the rate limiter shared by all calls to a model, created on first use
+   * from the config's rpm/tpm. Returns null when neither limit is set.
+   */
+  private getRateLimiter(model: string, config: ModelConfig): RateLimiter | null {
+    if (!config.rpm && !config.tpm) {
+      return null;
+    }
+    
+    let limiter = this.rateLimiters.get(model);
+    if (!limiter) {
+      limiter = new RateLimiter({ rpm: config.rpm, tpm: config.tpm });
+      this.rateLimiters.set(model, limiter);
+    }
+    return limiter;
+  }
+  
+  /**
+   * Get provider for model (created on first use, then reused)
    */
   private getProvider(model: string): any {
-    const modelLower = model.toLowerCase();
+    const route = routeModel(model);
     
-    if (modelLower.includes('gpt') || modelLower.includes('o1')) {
+    if (route === 'openai') {
       if (!this.openaiKey) {
         throw new Error('OpenAI API key not provided');
       }
-      return createOpenAI({ apiKey: this.openaiKey });
-    } else if (modelLower.includes('claude')) {
+      return (this.openaiProvider ??= createOpenAI({ apiKey: this.openaiKey }));
+    } else if (route === 'anthropic') {
       if (!this.anthropicKey) {
         throw new Error('Anthropic API key not provided');
       }
-      return createAnthropic({ apiKey: this.anthropicKey });
+      return (this.anthropicProvider ??= createAnthropic({ apiKey: this.anthropicKey }));
     } else {
       throw new Error(`Unknown model provider for: ${model}. Supported: OpenAI (gpt-*, o1-*), Anthropic (claude-*)`);
     }
@@ -291,6 +1297,41 @@ export class ModelRunner {
       totalTokens,
     };
   }
+  
+  /**
+   * Estimate cost for running a prompt over the actual samples, counting
+   * the system prompt and each sample's own input instead of assuming a
+   * fixed average input size
+   */
+  estimateSampleCost(
+    model: string,
+    prompt: string,
+    samples: (Stage1Sample | Stage2Sample)[],
+    avgOutputTokens: number = 150
+  ): {
+    model: string;
+    numSamples: number;
+    costPerSample: number;
+    totalCost: number;
+    totalTokens: number;
+  } {
+    const promptTokens = approximateTokens(prompt);
+    let inputTokens = 0;
+    for (const sample of samples) {
+      inputTokens += promptTokens + approximateTokens(userPromptFor(sample));
+    }
+    
+    const outputTokens = avgOutputTokens * samples.length;
+    const totalCost = this.calculateCost(model, inputTokens, outputTokens);
+    
+    return {
+      model,
+      numSamples: samples.length,
+      costPerSample: samples.length > 0 ? totalCost / samples.length : 0,
+      totalCost,
+      totalTokens: inputTokens + outputTokens,
+    };
+  }
 }
 
 /**
@@ -0,0 +1,148 @@
+/**
+ * Rate Limiter - Token buckets sized to a provider's per-minute limits.
+ *
+ * Lets batch runs use the full concurrency an account allows while keeping
+ * request and token rates under the RPM/TPM limits that would trigger 429s.
+ */
+
+export interface RateLimits {
+  /** Requests per minute */
+  rpm?: number;
+  /** Tokens (input + output) per minute */
+  tpm?: number;
+}
+
+/** Remaining-quota headers reported by OpenAI and Anthropic */
+const REMAINING_REQUESTS_HEADERS = [
+  'x-ratelimit-remaining-requests',
+  'anthropic-ratelimit-requests-remaining',
+];
+const REMAINING_TOKENS_HEADERS = [
+  'x-ratelimit-remaining-tokens',
+  'anthropic-ratelimit-tokens-remaining',
+];
+
+/**
+ * A bucket holding up to `capacity` units, refilled continuously at
+ * `capacity` units per minute
+ */
+class Bucket {
+  private level: number;
+  private updated = Date.now();
+  private readonly perMs: number;
+
+  constructor(private readonly capacity: number) {
+    this.level = capacity;
+    this.perMs = capacity / 60_000;
+  }
+
+  private refill(now: number): void {
+    this.level = Math.min(this.capacity, this.level + (now - this.updated) * this.perMs);
+    this.updated = now;
+  }
+
+  /** Milliseconds until `amount` units are available (0 if they are now) */
+  wait(amount: number, now: number): number {
+    this.refill(now);
+    // Requests larger than the bucket would never fit; let them drain it
+    const needed = Math.min(amount, this.capacity) - this.level;
+    return needed > 0 ? Math.ceil(needed / this.perMs) : 0;
+  }
+
+  take(amount: number): void {
+    this.level -= Math.min(amount, this.capacity);
+  }
+
+  /** Lower the level to what the provider reports as remaining */
+  clamp(remaining: number, now: number): void {
+    this.refill(now);
+    this.level = Math.min(this.level, remaining);
+  }
+}
+
+/**
+ * Request and token buckets shared by every call to one model.
+ *
+ * Callers are served in arrival order: a call that has to wait for tokens
+ * is not overtaken by smaller calls queued behind it.
+ */
+export class RateLimiter {
+  private readonly requests: Bucket | null;
+  private readonly tokens: Bucket | null;
+  private queue: { tokens: number; resolve: () => void }[] = [];
+  private timer: ReturnType<typeof setTimeout> | null = null;
+
+  constructor(limits: RateLimits) {
+    this.requests = limits.rpm ? new Bucket(limits.rpm) : null;
+    this.tokens = limits.tpm ? new Bucket(limits.tpm) : null;
+  }
+
+  /**
+   * Resolve once one request carrying an estimated `tokens` tokens fits in
+   * both buckets, and take it from them
+   */
+  acquire(tokens = 0): Promise<void> {
+    return new Promise((resolve) => {
+      this.queue.push({ tokens, resolve });
+      this.drain();
+    });
+  }
+
+  /**
+   * Tighten the buckets to the remaining quota in a response's rate-limit
+   * headers, which also account for other clients sharing the API key
+   */
+  update(headers: Record<string, string | undefined> | undefined): void {
+    if (!headers) return;
+
+    const now = Date.now();
+    const requests = remaining(headers, REMAINING_REQUESTS_HEADERS);
+    const tokens = remaining(headers, REMAINING_TOKENS_HEADERS);
+
+    if (this.requests && requests !== undefined) {
+      this.requests.clamp(requests, now);
+    }
+    if (this.tokens && tokens !== undefined) {
+      this.tokens.clamp(tokens, now);
+    }
+  }
+
+  private drain(): void {
+    if (this.timer) return;
+
+    while (this.queue.length > 0) {
+      const head = this.queue[0];
+      const now = Date.now();
+      const delay = Math.max(
+        this.requests?.wait(1, now) ?? 0,
+        this.tokens?.wait(head.tokens, now) ?? 0
+      );
+
+      if (delay > 0) {
+        this.timer = setTimeout(() => {
+          this.timer = null;
+          this.drain();
+        }, delay);
+        return;
+      }
+
+      this.requests?.take(1);
+      this.tokens?.take(head.tokens);
+      this.queue.shift();
+      head.resolve();
+    }
+  }
+}
+
+function remaining(
+  headers: Record<string, string | undefined>,
+  names: string[]
+): number | undefined {
+  for (const name of names) {
+    const value = Number(headers[name]);
+    if (headers[name] !== undefined && Number.isFinite(value)) {
+      return value;
+    }
+  }
+  return undefined;
+}
@@ -0,0 +1,70 @@
+/**
+ * Text Shortcut Cache - Reuse confident Stage 1 answers for recurring texts.
+ *
+ * Social media posts recur almost verbatim (reposts, quote chains, the same
+ * text with a different link or emoji). Once any model has classified a
+ * text with high confidence, later occurrences of its normalized form can
+ * skip the model call entirely. Entries are keyed by text alone, not by
+ * model or prompt, so leave this off for comparisons between models or
+ * prompts.
+ */
+
+import { createHash } from 'crypto';
+
+export interface ShortcutEntry {
+  hasClaim: boolean;
+  confidence: number;
+}
+
+const URL_PATTERN = /\bhttps?:\/\/\S+|\bwww\.\S+/g;
+const EMOJI_PATTERN = /[\p{Extended_Pictographic}\u{1F3FB}-\u{1F3FF}\u200D\uFE0F]/gu;
+const WHITESPACE_PATTERN = /\s+/g;
+
+/**
+ * Normalize text so trivial variants share an entry: lowercase, every URL
+ * collapsed to one token, emoji removed and whitespace collapsed
+ */
+export function normalizeText(text: string): string {
+  return text
+    .toLowerCase()
+    .replace(URL_PATTERN, '<url>')
+    .replace(EMOJI_PATTERN, '')
+    .replace(WHITESPACE_PATTERN, ' ')
+    .trim();
+}
+
+export class TextShortcutCache {
+  private entries = new Map<string, ShortcutEntry>();
+
+  /**
+   * @param minConfidence - Only answers at least this confident are stored
+   */
+  constructor(private readonly minConfidence: number = 0.95) {}
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  /**
+   * Look up a stored answer for text (or a trivial variant of it)
+   */
+  get(text: string): ShortcutEntry | undefined {
+    return this.entries.get(shortcutKey(text));
+  }
+
+  /**
+   * Store an answer if it is confident enough; the first one stored wins
+   */
+  record(text: string, hasClaim: boolean, confidence: number): void {
+    if (confidence < this.minConfidence) return;
+
+    const key = shortcutKey(text);
+    if (!this.entries.has(key)) {
+      this.entries.set(key, { hasClaim, confidence });
+    }
+  }
+}
+
+function shortcutKey(text: string): string {
+  return createHash('blake2b512').update(normalizeText(text)).digest('base64');
+}
@@ -4,19 +4,23 @@
  * Manages different prompt variants for testing and optimization.
  */
 
+/**
+ * A prompt variant. Templates are immutable once defined: the built-in ones
+ * are frozen, and consumers may cache anything derived from a template.
+ */
 export interface PromptTemplate {
-  id: string;
-  name: string;
-  version: string;
-  stage: 1 | 2;
-  systemPrompt: string;
-  description: string;
-  metadata?: Record<string, any>;
+  readonly id: string;
+  readonly name: string;
+  readonly version: string;
+  readonly stage: 1 | 2;
+  readonly systemPrompt: string;
+  readonly description: string;
+  readonly metadata?: Readonly<Record<string, any>>;
 }
 
 // ===== STAGE 1 PROMPTS: Claim Detection =====
 
-export const STAGE1_BASELINE: PromptTemplate = {
+export const STAGE1_BASELINE: PromptTemplate = Object.freeze({
   id: 'stage1_baseline',
   name: 'Baseline Claim Detection',
   version: '1.0',
@@ -46,9 +50,9 @@ Return JSON with:
   "reasoning": "brief explanation of your decision"
 }`,
   description: 'Original baseline prompt with clear inclusion/exclusion criteria',
-};
+});
 
-export const STAGE1_DETAILED: PromptTemplate = {
+export const STAGE1_DETAILED: PromptTemplate = Object.freeze({
   id: 'stage1_detailed_v1',
   name: 'Detailed Instructions v1',
   version: '1.1',
@@ -74,9 +78,9 @@ NEGATIVE EXAMPLES (these are NOT claims):
 
 Return JSON with hasClaim, claims array, confidence (0-1), and reasoning.`,
   description: 'More detailed instructions with explicit criteria and examples',
-};
+});
 
-export const STAGE1_CONSERVATIVE: PromptTemplate = {
+export const STAGE1_CONSERVATIVE: PromptTemplate = Object.freeze({
   id: 'stage1_conservative_v1',
   name: 'Conservative Mode',
   version: '1.0',
@@ -92,11 +96,11 @@ A claim MUST:
 
 Return JSON with hasClaim, claims, confidence, and reasoning.`,
   description: 'Biased toward fewer false positives, strict criteria',
-};
+});
 
 // ===== STAGE 2 PROMPTS: Verification =====
 
-export const STAGE2_BASELINE: PromptTemplate = {
+export const STAGE2_BASELINE: PromptTemplate = Object.freeze({
   id: 'stage2_baseline',
   name: 'Baseline Verification',
   version: '1.0',
@@ -119,9 +123,9 @@ Always cite specific sources in your explanation.
 
 Return JSON with verdict, confidence (0-1), explanation, sources array, and reasoning.`,
   description: 'Original baseline verification prompt',
-};
+});
 
-export const STAGE2_DETAILED: PromptTemplate = {
+export const STAGE2_DETAILED: PromptTemplate = Object.freeze({
   id: 'stage2_detailed_v1',
   name: 'Detailed Verification v1',
   version: '1.1',
@@ -147,9 +151,9 @@ NEVER guess or speculate. If evidence is unclear, mark as "unknown".
 
 Return JSON with verdict, confidence, explanation, sources (with reliabilityScore), and reasoning.`,
   description: 'Detailed verification with explicit source tiers and process',
-};
+});
 
-export const STAGE2_CONSERVATIVE: PromptTemplate = {
+export const STAGE2_CONSERVATIVE: PromptTemplate = Object.freeze({
   id: 'stage2_conservative_v1',
   name: 'Conservative Verification',
   version: '1.0',
@@ -167,64 +171,85 @@ It is better to admit we don't know than to make an incorrect determination.
 
 Return JSON with verdict, confidence, explanation, sources, and reasoning.`,
   description: 'Biased toward "unknown", requires strong evidence',
+});
+
+const BUILT_IN_PROMPTS: readonly PromptTemplate[] = [
+  STAGE1_BASELINE,
+  STAGE1_DETAILED,
+  STAGE1_CONSERVATIVE,
+  STAGE2_BASELINE,
+  STAGE2_DETAILED,
+  STAGE2_CONSERVATIVE,
+];
+
+// Built-in indexes, built once at module load and copied by each registry
+const BUILT_IN_BY_ID = new Map<string, PromptTemplate>(BUILT_IN_PROMPTS.map((p) => [p.id, p]));
+const BUILT_IN_BY_STAGE = {
+  1: new Map<string, PromptTemplate>(
+    BUILT_IN_PROMPTS.filter((p) => p.stage === 1).map((p) => [p.id, p])
+  ),
+  2: new Map<string, PromptTemplate>(
+    BUILT_IN_PROMPTS.filter((p) => p.stage === 2).map((p) => [p.id, p])
+  ),
 };
 
 // ===== Prompt Registry Class =====
 
 export class PromptRegistry {
-  private prompts: Map<string, PromptTemplate> = new Map();
-  
-  constructor() {
-    // Register built-in prompts
-    this.register(STAGE1_BASELINE);
-    this.register(STAGE1_DETAILED);
-    this.register(STAGE1_CONSERVATIVE);
-    this.register(STAGE2_BASELINE);
-    this.register(STAGE2_DETAILED);
-    this.register(STAGE2_CONSERVATIVE);
-  }
+  // Starts with the built-in prompts
+  private prompts: Map<string, PromptTemplate> = new Map(BUILT_IN_BY_ID);
+  // The same prompts partitioned by stage, so stage-filtered lookups and
+  // listings never scan or filter the full registry
+  private promptsByStage: Record<1 | 2, Map<string, PromptTemplate>> = {
+    1: new Map(BUILT_IN_BY_STAGE[1]),
+    2: new Map(BUILT_IN_BY_STAGE[2]),
+  };
   
   /**
    * Register a prompt template
    */
   register(prompt: PromptTemplate): void {
+    // Re-registering an id may move it to the other stage
+    const previous = this.prompts.get(prompt.id);
+    if (previous && previous.stage !== prompt.stage) {
+      this.promptsByStage[previous.stage].delete(prompt.id);
+    }
+    
     this.prompts.set(prompt.id, prompt);
+    this.promptsByStage[prompt.stage].set(prompt.id, prompt);
   }
   
   /**
    * Get prompt by ID
    */
   getPrompt(promptId: string, stage?: 1 | 2): PromptTemplate | null {
-    const prompt = this.prompts.get(promptId);
-    
-    if (!prompt) {
-      return null;
-    }
-    
-    if (stage && prompt.stage !== stage) {
-      return null;
-    }
-    
-    return prompt;
+    const prompts = stage ? this.promptsByStage[stage] : this.prompts;
+    return prompts.get(promptId) ?? null;
   }
   
   /**
    * List all prompt IDs, optionally filtered by stage
    */
   listPrompts(stage?: 1 | 2): string[] {
-    const prompts = Array.from(this.prompts.values());
-    
-    if (stage) {
-      return prompts.filter((p) => p.stage === stage).map((p) => p.id);
-    }
-    
-    return prompts.map((p) => p.id);
+    const prompts = stage ? this.promptsByStage[stage] : this.prompts;
+    return Array.from(prompts.keys());
   }
   
   /**
    * Get all prompts for a stage
    */
   getPromptsForStage(stage: 1 | 2): PromptTemplate[] {
-    return Array.from(this.prompts.values()).filter((p) => p.stage === stage);
+    return Array.from(this.promptsByStage[stage].values());
   }
 }
+
+let defaultRegistry: PromptRegistry | null = null;
+
+/**
+ * Get the process-wide registry, created on first use. Scripts share it
+ * instead of each building their own; prompts registered on it are visible
+ * to every caller.
+ */
+export function getPromptRegistry(): PromptRegistry {
+  return (defaultRegistry ??= new PromptRegistry());
+}
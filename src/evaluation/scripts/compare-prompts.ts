@@ -9,7 +9,7 @@
 import { DatasetManager } from '../dataset/dataset-manager';
 import { ModelRunner } from '../models/model-runner';
 import { Stage1Evaluator } from '../evaluation/evaluators';
-import { PromptRegistry } from '../prompts/prompt-registry';
+import { getPromptRegistry } from '../prompts/prompt-registry';
 import * as path from 'path';
 
 // Production prompt from extension
@@ -74,7 +74,7 @@ async function main() {
   const manager = new DatasetManager(datasetsDir);
   const runner = new ModelRunner();
   const evaluator = new Stage1Evaluator();
-  const registry = new PromptRegistry();
+  const registry = getPromptRegistry();
 
   // Load test data
   let testData;
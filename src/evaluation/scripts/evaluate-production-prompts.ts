@@ -93,7 +93,12 @@ async function main() {
   console.log();
 
   // Estimate cost
-  const estimate = runner.estimateCost('gpt-4o-mini', testData.length, 200, 100);
+  const estimate = runner.estimateSampleCost(
+    'gpt-4o-mini',
+    PRODUCTION_STAGE1_PROMPT,
+    testData,
+    100
+  );
   console.log(`Estimated cost: $${estimate.totalCost.toFixed(4)}`);
   console.log(`Cost per sample: $${estimate.costPerSample.toFixed(6)}`);
   console.log();
@@ -139,6 +139,43 @@ export function validateStage2Sample(data: unknown): Stage2Sample {
   return sample;
 }
 
+/**
+ * Build a Stage 1 sample from data known to be valid (e.g. a dataset written by
+ * saveStage1), applying schema defaults without running validation
+ */
+export function trustedStage1Sample(data: any): Stage1Sample {
+  return {
+    id: data.id,
+    text: data.text,
+    platform: data.platform,
+    hasClaim: data.hasClaim,
+    claims: data.claims,
+    annotator: data.annotator ?? '',
+    confidence: data.confidence ?? 1.0,
+    metadata: data.metadata ?? {},
+  };
+}
+
+/**
+ * Build a Stage 2 sample from data known to be valid (e.g. a dataset written by
+ * saveStage2), applying schema defaults without running validation
+ */
+export function trustedStage2Sample(data: any): Stage2Sample {
+  return {
+    id: data.id,
+    claim: data.claim,
+    verdict: data.verdict,
+    confidence: data.confidence,
+    sources: data.sources,
+    explanation: data.explanation ?? '',
+    reasoning: data.reasoning ?? '',
+    difficulty: data.difficulty ?? Difficulty.MEDIUM,
+    topic: data.topic ?? Topic.OTHER,
+    annotator: data.annotator ?? '',
+    metadata: data.metadata ?? {},
+  };
+}
+
 /**
  * Check dataset balance and return label distribution
  */
@@ -149,10 +186,28 @@ export function validateDatasetBalance<T extends { hasClaim?: boolean; verdict?:
   const counts: Record<string, number> = {};
   const total = samples.length;
   
-  samples.forEach((sample) => {
-    const label = String(sample[labelField]);
-    counts[label] = (counts[label] || 0) + 1;
-  });
+  if (labelField === 'hasClaim') {
+    // Binary label: count the true side only and derive the false side
+    let trueCount = 0;
+    for (const sample of samples) {
+      if (sample.hasClaim) trueCount++;
+    }
+    
+    // Keep first-seen label order and omit empty labels, as the general path does
+    const labels: Array<[string, number]> = [
+      ['true', trueCount],
+      ['false', total - trueCount],
+    ];
+    if (total > 0 && !samples[0].hasClaim) labels.reverse();
+    for (const [label, count] of labels) {
+      if (count > 0) counts[label] = count;
+    }
+  } else {
+    for (const sample of samples) {
+      const label = String(sample[labelField]);
+      counts[label] = (counts[label] || 0) + 1;
+    }
+  }
   
   const result: Record<string, { count: number; percentage: number }> = {};
   Object.entries(counts).forEach(([label, count]) => {